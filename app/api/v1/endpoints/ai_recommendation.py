@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.dependencies import get_current_user_data
-from app.models.user import User
+from app.dependencies import Principal, get_current_principal
 from app.schemas.ai_recommendation import AIRecommendationCreate, AIRecommendationResponse
 from app.services.ai_recommendation import generate_ai_recommendation
 import logging
@@ -15,7 +14,7 @@ logger = logging.getLogger(__name__)
 async def create_ai_recommendation(
     data: AIRecommendationCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         recommendation = await generate_ai_recommendation(data, db, current_user)
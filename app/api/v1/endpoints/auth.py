@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, BackgroundTasks, status, HTTPException,
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordBearer
 from datetime import timedelta, date, datetime
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
 from app.schemas.token import Token, RefreshTokenRequest
@@ -10,6 +11,7 @@ from app.schemas.payload import BaseResponse
 from app.services.oauth import oauth
 from app.utils.email_utils import send_verification_email
 from app.core.database import get_db
+from app.core.rate_limit import code_check_limiter, code_email_limiter, login_limiter
 import logging
 from app.schemas.user import (
     UserCreateRequestDto,
@@ -34,10 +36,8 @@ from app.services.auth import (
     get_or_create_user
 
 )
-from app.services.token import (
-    create_access_token,
-    create_refresh_token,
-)
+from app.services.refresh_token import issue_refresh_token, revoke_refresh_token
+from app.services.token import create_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 logger = logging.getLogger(__name__)
@@ -102,15 +102,22 @@ async def refresh_access_token(
     data: RefreshTokenRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    return await generate_new_access_token(data.refresh_token, db)
+    tokens = await generate_new_access_token(data.refresh_token, db)
+
+    # The old refresh token is spent, so the cookies carry its successor
+    response = JSONResponse(tokens)
+    set_access_cookies(response, tokens["access_token"], tokens["refresh_token"])
+    return response
 
 
 
 @auth_router.post("/reset-password", response_model=BaseResponse)
 async def reset_password(
     data: PasswordResetCompleteDto,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
+    await code_check_limiter.check(request, data.email)
     await reset_user_password(data.email, data.token, data.new_password, db)
 
     return BaseResponse(
@@ -124,9 +131,11 @@ async def reset_password(
 @auth_router.post("/request-password-reset", response_model=BaseResponse)
 async def request_password_reset(
     data: PasswordResetRequestDto,
+    request: Request,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db)
 ):
+    await code_email_limiter.check(request, data.email)
 
     user, reset_code = await generate_password_reset_code(data.email, db)
 
@@ -141,7 +150,15 @@ async def request_password_reset(
 
 
 @auth_router.post("/logout", response_model=BaseResponse)
-async def logout_user():
+async def logout_user(
+    request: Request,
+    data: Optional[RefreshTokenRequest] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    # End the session server-side too, whether the client keeps the token in a cookie or not
+    refresh_token = data.refresh_token if data else request.cookies.get("refresh_token", "").removeprefix("Bearer ")
+    await revoke_refresh_token(db, refresh_token)
+
     try:
         response = JSONResponse({
             "message": "Logout successful. See you again! 👋",
@@ -160,8 +177,11 @@ async def logout_user():
 @auth_router.post("/login", response_model=Token)
 async def login_user(
     form_data: LoginUserDto,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
+    await login_limiter.check(request, form_data.email)
+
     # Authenticate the user
     user = await validate_user_credentials(db, form_data.email, form_data.password)
 
@@ -173,9 +193,7 @@ async def login_user(
         data={"sub": str(user.uuid)},
         expires_delta=access_token_expires
     )
-    refresh_token = create_refresh_token(
-        data={"sub": str(user.uuid)}
-    )
+    refresh_token = await issue_refresh_token(db, user.id, str(user.uuid))
 
     # Create a response and set cookies
     response = JSONResponse({
@@ -193,7 +211,10 @@ async def login_user(
 
 
 @auth_router.post("/resend-verification-code", status_code=status.HTTP_200_OK)
-async def resend_code(email: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
+async def resend_code(
+    email: str, request: Request, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)
+):
+    await code_email_limiter.check(request, email)
     user, new_verification_code = await generate_and_save_verification_code(email, db)
 
     background_tasks.add_task(
@@ -213,7 +234,8 @@ async def resend_code(email: str, background_tasks: BackgroundTasks, db: AsyncSe
 
 
 @auth_router.post("/verify", status_code=status.HTTP_200_OK)
-async def verify_email(email: str, verification_code: str, db: AsyncSession = Depends(get_db)):
+async def verify_email(email: str, verification_code: str, request: Request, db: AsyncSession = Depends(get_db)):
+    await code_check_limiter.check(request, email)
     return await verify_user(email, verification_code, db)
 
 
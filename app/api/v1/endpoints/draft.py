@@ -3,8 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.services.draft import save_draft, get_draft, delete_draft
 from app.schemas.draft import DraftCreateUpdateInput, DraftResponse
-from app.models.user import User
-from app.dependencies import get_current_user_data
+from app.dependencies import Principal, get_current_principal
 
 draft_router = APIRouter()
 
@@ -18,7 +17,7 @@ async def save_draft_route(
     test_uuid: str,
     draft_data: DraftCreateUpdateInput,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         return await save_draft(test_uuid, draft_data, current_user.id, db)
@@ -36,7 +35,7 @@ async def save_draft_route(
 async def get_draft_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         return await get_draft(test_uuid, current_user.id, db)
@@ -52,7 +51,7 @@ async def get_draft_route(
 async def delete_draft_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         return await delete_draft(test_uuid, current_user.id, db)
@@ -3,7 +3,7 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
-from app.dependencies import get_current_user_data
+from app.dependencies import Principal, get_current_principal
 from app.services.feedback import (
     create_feedback,
     get_all_feedbacks, promote_feedback, get_promoted_feedbacks,
@@ -42,9 +42,9 @@ async def fetch_promoted_feedbacks(db: AsyncSession = Depends(get_db)):
 async def promote_user_feedback(
     feedback_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
-    if not any(role.name == "ADMIN" for role in current_user.roles):
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="User does not have permission to promote feedback."
         )
@@ -84,7 +84,7 @@ async def fetch_all_feedbacks(db: AsyncSession = Depends(get_db)):
 async def create_user_feedback(
     payload: CreateFeedbackRequest,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     feedback_uuid = await create_feedback(payload.feedback, payload.assessment_type_uuid, current_user, db)
     return CreateFeedbackResponse(
@@ -0,0 +1,153 @@
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from app.core.cache import prediction_cache, principal_cache
+from app.core.database import pool_stats
+from app.core.inference import inference_engine
+from app.core.password_hasher import password_hasher
+from app.core.rate_limit import rate_limit_stats
+from app.core.token_verifier import token_verifier
+from app.dependencies import Principal, get_current_principal
+from app.schemas.payload import BaseResponse
+from app.schemas.system import ModelVersionActivateRequest
+from app.services.reference_data import reference_data
+from ml_models.model_loader import list_model_versions
+from ml_models.registry import model_registry
+
+system_router = APIRouter()
+
+
+def ensure_admin(current_user: Principal = Depends(get_current_principal)) -> Principal:
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="User does not have permission to view system metrics."
+        )
+    return current_user
+
+
+@system_router.get(
+    "/inference-stats",
+    summary="Model inference batching and executor metrics",
+    description="Report batch sizes, executor queue depth and the time batches wait for a free worker.",
+)
+async def get_inference_stats(current_user: Principal = Depends(ensure_admin)):
+    return inference_engine.stats()
+
+
+@system_router.get(
+    "/prediction-cache",
+    summary="Prediction cache metrics",
+    description="Report the size, hit and miss counts of the memoized assessment predictions.",
+)
+async def get_prediction_cache_stats(current_user: Principal = Depends(ensure_admin)):
+    return prediction_cache.stats()
+
+
+@system_router.get(
+    "/principal-cache",
+    summary="Principal cache metrics",
+    description="Report the size, hit and miss counts of the cached authenticated principals.",
+)
+async def get_principal_cache_stats(current_user: Principal = Depends(ensure_admin)):
+    return principal_cache.stats()
+
+
+@system_router.get(
+    "/token-verifier",
+    summary="Token verification metrics",
+    description="Report JWT signature checks, rejected and malformed tokens and the verified-claims cache.",
+)
+async def get_token_verifier_stats(current_user: Principal = Depends(ensure_admin)):
+    return token_verifier.stats()
+
+
+@system_router.get(
+    "/password-hasher",
+    summary="Password hashing pool metrics",
+    description="Report bcrypt operations in flight, how long they waited for a worker and how many were rejected.",
+)
+async def get_password_hasher_stats(current_user: Principal = Depends(ensure_admin)):
+    return password_hasher.stats()
+
+
+@system_router.get(
+    "/rate-limits",
+    summary="Auth rate limiter metrics",
+    description="Report the limits, allowed and rejected counts of the login and verification code limiters.",
+)
+async def get_rate_limit_stats(current_user: Principal = Depends(ensure_admin)):
+    return rate_limit_stats()
+
+
+@system_router.get(
+    "/db-pool",
+    summary="Database connection pool metrics",
+    description=(
+        "Report pool size, connections checked out and in overflow, and how long requests waited "
+        "for a connection, including slow checkouts and timeouts."
+    ),
+)
+async def get_db_pool_stats(current_user: Principal = Depends(ensure_admin)):
+    return pool_stats()
+
+
+@system_router.post(
+    "/reference-data/invalidate",
+    response_model=BaseResponse,
+    summary="Reload the reference data",
+    description=(
+        "Drop this worker's snapshot of the reference tables (personality types, dimensions, value "
+        "categories, Holland codes, careers) and the response fragments built from it, so the next "
+        "request reloads them. Other workers reload within REFERENCE_DATA_TTL_SECONDS."
+    ),
+)
+async def invalidate_reference_data(current_user: Principal = Depends(ensure_admin)):
+    previous_version = reference_data.version
+    reference_data.invalidate()
+    return BaseResponse(
+        date=date.today(),
+        status=status.HTTP_200_OK,
+        message="Reference data will be reloaded on the next request.",
+        payload={"previous_version": previous_version},
+    )
+
+
+@system_router.get(
+    "/models",
+    summary="Model registry state",
+    description="List the registered model sets and how long each loaded one took to load.",
+)
+async def get_model_registry(current_user: Principal = Depends(ensure_admin)):
+    return model_registry.stats()
+
+
+@system_router.post(
+    "/models/activate",
+    response_model=BaseResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Swap the active model version",
+    description=(
+        "Warm up every model of the given version in the background, then switch new requests to it. "
+        "Requests already in progress finish on the version they started with."
+    ),
+)
+async def activate_model_version(
+    data: ModelVersionActivateRequest,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(ensure_admin),
+):
+    if data.version not in list_model_versions():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Model version '{data.version}' not found.")
+    if model_registry.warming_version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Model version '{model_registry.warming_version}' is still warming up.",
+        )
+
+    background_tasks.add_task(model_registry.activate, data.version)
+
+    return BaseResponse(
+        date=date.today(),
+        status=status.HTTP_202_ACCEPTED,
+        message=f"Warming up model version '{data.version}'; it becomes active once loaded.",
+        payload={"version": data.version, "active_version": model_registry.active_version},
+    )
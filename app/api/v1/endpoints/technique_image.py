@@ -9,15 +9,14 @@ from app.services.technique_image import (
 )
 from app.schemas.technique_image import LearningStyleTechniqueImageResponse
 from app.schemas.payload import BaseResponse
-from app.models.user import User
-from app.dependencies import get_current_user_data
+from app.dependencies import Principal, get_current_principal
 
 
 learning_style_image_router = APIRouter()
 
 
-def is_admin(current_user: User):
-    if not hasattr(current_user, "roles") or "ADMIN" not in {role.name.upper() for role in current_user.roles}:
+def is_admin(current_user: Principal):
+    if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Access forbidden: Admins only")
 
 
@@ -30,7 +29,7 @@ async def upload_learning_style_image_route(
     technique_uuid: str = Form(...),
     file: UploadFile = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         is_admin(current_user)
@@ -50,7 +49,7 @@ async def update_learning_style_image_route(
     image_uuid: str,
     file: UploadFile = Form(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         is_admin(current_user)
@@ -68,7 +67,7 @@ async def update_learning_style_image_route(
 )
 async def load_all_learning_style_images_route(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         return await load_all_learning_style_images(db)
@@ -86,7 +85,7 @@ async def load_all_learning_style_images_route(
 async def delete_learning_style_image_route(
     image_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     """Delete a learning style image."""
     try:
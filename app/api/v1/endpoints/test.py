@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.schemas.assessment import AssessmentResponseList
 from app.schemas.payload import BaseResponse
@@ -6,8 +7,8 @@ from app.schemas.test import GetTestDetailsResponse, UserTestsResponse
 from app.services.test import get_assessment_responses_by_test, get_test_details, get_tests_by_user, delete_test, \
     generate_shareable_link, get_shared_test
 from app.core.database import get_db
-from app.dependencies import get_current_user_data
-from app.models.user import User
+from app.core.sql_logging import query_budget
+from app.dependencies import Principal, get_current_principal
 
 test_router = APIRouter()
 
@@ -37,7 +38,7 @@ async def get_shared_test_route(
 async def generate_shareable_link_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data)
+    current_user: Principal = Depends(get_current_principal)
 ):
     try:
         base_url = "http://127.0.0.1:8000"
@@ -56,7 +57,7 @@ async def generate_shareable_link_route(
 async def delete_test_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data)
+    current_user: Principal = Depends(get_current_principal)
 ):
     try:
         return await delete_test(test_uuid, current_user.id, db)
@@ -68,16 +69,28 @@ async def delete_test_route(
 
 @test_router.get(
     "/user-tests",
+    dependencies=[Depends(query_budget(3))],
     response_model=UserTestsResponse,
-    summary="Retrieve all tests for the current user with formatted timestamps",
+    summary="Retrieve the current user's tests, newest first, one page at a time",
 )
 async def get_tests_by_user_route(
+    limit: int = Query(20, ge=1, le=100, description="Tests per page"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    assessment_type_uuid: Optional[str] = Query(None, description="Only tests with a response of this assessment type"),
+    is_completed: Optional[bool] = Query(None, description="Only completed or only incomplete tests"),
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data)
+    current_user: Principal = Depends(get_current_principal)
 ):
     try:
-        tests = await get_tests_by_user(current_user.id, db)
-        return UserTestsResponse(user_id=current_user.id, tests=tests)
+        page = await get_tests_by_user(
+            current_user.id,
+            db,
+            limit=limit,
+            cursor=cursor,
+            assessment_type_uuid=assessment_type_uuid,
+            is_completed=is_completed,
+        )
+        return UserTestsResponse(user_id=current_user.id, **page)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -86,13 +99,14 @@ async def get_tests_by_user_route(
 
 @test_router.get(
     "/get-test-details/{test_uuid}",
+    dependencies=[Depends(query_budget(2))],
     response_model=GetTestDetailsResponse,
     summary="Retrieve test details with assessments and drafts",
 )
 async def get_test_details_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user=Depends(get_current_user_data)
+    current_user: Principal = Depends(get_current_principal)
 ):
     try:
         return await get_test_details(test_uuid, current_user.id, db)
@@ -111,7 +125,7 @@ async def get_test_details_route(
 async def get_responses_by_test_route(
     test_uuid: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user_data),
+    current_user: Principal = Depends(get_current_principal),
 ):
     try:
         responses = await get_assessment_responses_by_test(test_uuid, db, current_user.id)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File
+from datetime import datetime
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, status, UploadFile, File
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.dependencies import get_current_user
 from app.schemas.user import (
+    UserListResponseDto,
     UserResponseDto,
     UpdateUserDto,
     UpdateBioDto
@@ -56,10 +59,28 @@ async def update_user_by_uuid_route(uuid: str, user_update: UpdateUserDto, db: A
     return await update_user_by_uuid(uuid, user_update, db)
 
 
-# Get a list of all users.
-@user_router.get("/list", response_model=list[UserResponseDto])
-async def list_all_users_route(db: AsyncSession = Depends(get_db)):
-    return await get_all_users(db)
+# Get a page of users, newest first.
+@user_router.get("/list", response_model=UserListResponseDto)
+async def list_all_users_route(
+    limit: int = Query(50, ge=1, le=200, description="Users per page"),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page"),
+    is_verified: Optional[bool] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    registered_from: Optional[datetime] = Query(None, description="Registered at or after"),
+    registered_to: Optional[datetime] = Query(None, description="Registered before"),
+    search: Optional[str] = Query(None, min_length=1, max_length=100, description="Username or email prefix"),
+    db: AsyncSession = Depends(get_db),
+):
+    return await get_all_users(
+        db,
+        limit=limit,
+        cursor=cursor,
+        is_verified=is_verified,
+        is_active=is_active,
+        registered_from=registered_from,
+        registered_to=registered_to,
+        search=search,
+    )
 
 
 # Retrieve user details by UUID.
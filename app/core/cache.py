@@ -0,0 +1,113 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+import numpy as np
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire `ttl_seconds` after they were stored.
+
+    Once `maxsize` entries are held, storing a new one evicts the least recently used.
+    A `ttl_seconds` of 0 or less disables expiry. Hit, miss and eviction counters are
+    kept for monitoring.
+    """
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = max(0, maxsize)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        if self.maxsize == 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl > 0 else None
+
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def prediction_key(model_name: str, model_version: str, *vectors: np.ndarray) -> str:
+    """
+    Cache key for a prediction: the model, its version and the exact input vectors.
+
+    Feature vectors are built in the model's own column order, so equal answer sets
+    always produce the same bytes regardless of the order they were submitted in.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(f"{model_name}\0{model_version}".encode())
+    for vector in vectors:
+        digest.update(b"\0")
+        digest.update(np.ascontiguousarray(vector, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+prediction_cache = TTLCache(
+    maxsize=settings.PREDICTION_CACHE_SIZE,
+    ttl_seconds=settings.PREDICTION_CACHE_TTL_SECONDS,
+)
+
+# Resolved request principals by user uuid. Services that change a user's roles or
+# account state delete the entry, in their own process only: other worker processes
+# keep their copy for up to PRINCIPAL_CACHE_TTL_SECONDS.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Verified JWT claims by SHA-256 of the token; each entry expires with its token
+token_claims_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_MAX_TTL_SECONDS,
+)
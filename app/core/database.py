@@ -1,10 +1,144 @@
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from sqlalchemy import exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.core.sql_logging import instrument_engine
+
+logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.database_url
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+
+class PoolMetrics:
+    """
+    Counters for connection checkouts: how long callers waited for a connection, how
+    often the pool had to open overflow connections and how often a checkout timed out.
+    """
+
+    def __init__(self, slow_checkout_seconds: float):
+        self.slow_checkout_seconds = slow_checkout_seconds
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflows = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def record_checkout(self, waited: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            if waited > self.slow_checkout_seconds:
+                self.slow_checkouts += 1
+        if waited > self.slow_checkout_seconds:
+            logger.warning(f"Waited {waited * 1000:.1f} ms for a database connection.")
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflows += 1
+
+    def record_timeout(self, waited: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.error(f"Timed out after {waited * 1000:.1f} ms waiting for a database connection.")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "overflow_connections_opened": self.overflows,
+                "checkout_timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "average_wait_ms": round(self._total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics(slow_checkout_seconds=settings.DB_POOL_SLOW_CHECKOUT_MS / 1000)
+
+
+# Connect time of the checkout in progress in this context (greenlet). Set only around
+# the outermost _do_get, so the retries QueuePool._do_get makes by calling itself are
+# not counted as checkouts of their own.
+_checkout_connect_time: ContextVar[Optional[List[float]]] = ContextVar("checkout_connect_time", default=None)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times every checkout, so pool exhaustion shows up in `pool_metrics`
+    instead of only as request latency. The recorded wait is the time spent waiting for
+    the pool, not the time spent opening a new connection.
+    """
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        if _checkout_connect_time.get() is not None:
+            return super()._do_get()
+
+        connect_time = [0.0]
+        token = _checkout_connect_time.set(connect_time)
+        started_at = time.monotonic()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.monotonic() - started_at)
+            raise
+        finally:
+            _checkout_connect_time.reset(token)
+        self.metrics.record_checkout(time.monotonic() - started_at - connect_time[0])
+        return connection
+
+    def _create_connection(self):
+        started_at = time.monotonic()
+        try:
+            return super()._create_connection()
+        finally:
+            connect_time = _checkout_connect_time.get()
+            if connect_time is not None:
+                connect_time[0] += time.monotonic() - started_at
+
+    def _inc_overflow(self) -> bool:
+        # Called just before a new connection is opened; past pool_size it is an overflow one.
+        opened = super()._inc_overflow()
+        if opened and self._overflow > 0:
+            self.metrics.record_overflow()
+        return opened
+
+
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL,
+    echo=settings.SQL_ECHO,
+    poolclass=InstrumentedPool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+)
+instrument_engine(engine.sync_engine)
+
+
+def pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+        **pool_metrics.stats(),
+    }
+
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -0,0 +1,274 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from ml_models.registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# A predictor takes the rows of one batch and the model version to use, and returns
+# one output per row, in order.
+Predictor = Callable[[List[Any], Optional[str]], Sequence[Any]]
+
+
+def _preload_modules(module_names: Iterable[str], version: str, load_models: bool) -> None:
+    # Importing the service modules registers their models in each worker process.
+    for module_name in module_names:
+        importlib.import_module(module_name)
+    model_registry.set_active_version(version)
+    if load_models:
+        model_registry.load_all()
+
+
+def _run_timed(
+    predictor: Predictor, rows: List[Any], version: Optional[str], submitted_at: float
+) -> Tuple[Sequence[Any], float]:
+    started_at = time.monotonic()
+    return predictor(rows, version), started_at - submitted_at
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound model predictions off the event loop.
+
+    `kind="thread"` uses a thread pool in the current process; `kind="process"` uses a
+    process pool per model version, whose workers import the predictor modules (and so
+    load their models) when they start. The pool of a new version is started and warmed
+    up before the version is activated, and shut down when the version is retired.
+    Queue depth and the time batches wait for a free worker are tracked for monitoring.
+    """
+
+    def __init__(self, kind: str, max_workers: int):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported inference executor '{kind}'. Use 'thread' or 'process'.")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executors: Dict[Optional[str], Executor] = {}
+        self._preload_modules = set()
+        self._in_flight = 0
+        self._completed = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_run = 0.0
+
+    def preload(self, module_name: str) -> None:
+        self._preload_modules.add(module_name)
+
+    def _new_process_pool(self, version: str, load_models: bool) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_preload_modules,
+            initargs=(sorted(self._preload_modules), version, load_models),
+        )
+
+    def _get_executor(self, version: Optional[str]) -> Executor:
+        # Thread workers share this process's registry, so one pool serves every version
+        key = (version or model_registry.active_version) if self.kind == "process" else None
+        executor = self._executors.get(key)
+        if executor is None:
+            if self.kind == "process":
+                executor = self._new_process_pool(key, settings.MODEL_PRELOAD)
+            else:
+                executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+            self._executors[key] = executor
+        return executor
+
+    async def warm_up(self, version: str) -> None:
+        """
+        Start a process pool for `version` whose workers have loaded its models, so the
+        first batches after a swap do not load them. Any pool the version already had is
+        replaced, since its workers may have started cold. No-op for thread workers, which
+        use the models `ModelRegistry.activate` has just loaded.
+        """
+        if self.kind != "process":
+            return
+        executor = self._new_process_pool(version, load_models=True)
+        loop = asyncio.get_running_loop()
+        try:
+            # Submitting a task per worker before any has started makes the pool start
+            # all of them; each loads the models in its initializer.
+            await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.max_workers)))
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        previous = self._executors.get(version)
+        self._executors[version] = executor
+        if previous is not None:
+            # Batches already running on the old pool finish there
+            previous.shutdown(wait=False)
+        logger.info(f"Warmed up {self.max_workers} inference worker processes for model version '{version}'.")
+
+    def release(self, version: str) -> None:
+        """
+        Shut down the process pool of a retired model version.
+        """
+        executor = self._executors.pop(version, None) if self.kind == "process" else None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    async def run(self, predictor: Predictor, rows: List[Any], version: Optional[str] = None) -> Sequence[Any]:
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor(version)
+        submitted_at = time.monotonic()
+        self._in_flight += 1
+        try:
+            outputs, waited = await loop.run_in_executor(executor, _run_timed, predictor, rows, version, submitted_at)
+        finally:
+            self._in_flight -= 1
+
+        self._completed += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        self._total_run += time.monotonic() - submitted_at - waited
+        if waited > 0.1:
+            logger.warning(f"Inference batch waited {waited * 1000:.1f} ms for a free {self.kind} worker.")
+        return outputs
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "pools": sorted(key for key in self._executors if key is not None),
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.max_workers),
+            "completed_batches": self._completed,
+            "average_wait_ms": round(self._total_wait / self._completed * 1000, 3) if self._completed else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+            "average_run_ms": round(self._total_run / self._completed * 1000, 3) if self._completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors.clear()
+
+
+class BatchInferenceEngine:
+    """
+    Coalesces concurrent single-row predictions into batched model calls.
+
+    Each call to `predict` queues its row for the named model. The queue is flushed
+    once it holds `max_batch_size` rows or `batch_window_ms` after the first row was
+    queued, whichever happens first. The predictor runs once for the whole batch and
+    every awaiting request receives its own row of the output. Predictors run on the
+    `executor`, never on the event loop. Rows are only batched with rows pinned to the
+    same model version.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int, batch_window_ms: float):
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.batch_window = max(0.0, batch_window_ms) / 1000
+        self._predictors: Dict[str, Predictor] = {}
+        self._pending: Dict[Tuple[str, Optional[str]], List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Tuple[str, Optional[str]], asyncio.TimerHandle] = {}
+        self._tasks = set()
+        self._batches = 0
+        self._rows = 0
+
+    def register(self, name: str, predictor: Predictor) -> None:
+        self._predictors[name] = predictor
+        self.executor.preload(predictor.__module__)
+
+    async def predict(self, name: str, row: Any, version: Optional[str] = None) -> Any:
+        if name not in self._predictors:
+            raise KeyError(f"No predictor registered under '{name}'.")
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (name, version)
+        queue = self._pending.setdefault(key, [])
+        queue.append((row, future))
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.batch_window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple[str, Optional[str]]) -> None:
+        timer = self._timers.pop(key, None)
+        if timer:
+            timer.cancel()
+
+        batch = [(row, future) for row, future in self._pending.pop(key, []) if not future.done()]
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(*key, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, name: str, version: Optional[str], batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        self._batches += 1
+        self._rows += len(batch)
+        try:
+            await self._resolve_batch(name, version, batch)
+        finally:
+            # Never leave a request waiting, even when the batch was cancelled or the
+            # executor raised something other than an Exception (e.g. a broken pool).
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError(f"Prediction for '{name}' did not complete."))
+
+    async def _predict_rows(self, name: str, version: Optional[str], rows: List[Any]) -> Sequence[Any]:
+        outputs = await self.executor.run(self._predictors[name], rows, version)
+        if len(outputs) != len(rows):
+            raise ValueError(f"Predictor '{name}' returned {len(outputs)} outputs for {len(rows)} rows.")
+        return outputs
+
+    async def _resolve_batch(self, name: str, version: Optional[str], batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            outputs = await self._predict_rows(name, version, [row for row, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][1].done():
+                    batch[0][1].set_exception(e)
+                return
+            # Retry row by row so a single bad submission only fails its own request.
+            logger.warning(f"Batched prediction for '{name}' failed, retrying {len(batch)} rows individually: {e}")
+            for row, future in batch:
+                try:
+                    output = (await self._predict_rows(name, version, [row]))[0]
+                except Exception as row_error:
+                    if not future.done():
+                        future.set_exception(row_error)
+                else:
+                    if not future.done():
+                        future.set_result(output)
+            return
+
+        for (_, future), output in zip(batch, outputs):
+            # The awaiting request may have been cancelled while the batch was running.
+            if not future.done():
+                future.set_result(output)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "batch_window_ms": self.batch_window * 1000,
+            "batches": self._batches,
+            "rows": self._rows,
+            "average_batch_size": round(self._rows / self._batches, 2) if self._batches else 0.0,
+            "pending_rows": sum(len(queue) for queue in self._pending.values()),
+            "executor": self.executor.stats(),
+        }
+
+
+inference_executor = InferenceExecutor(
+    kind=settings.INFERENCE_EXECUTOR,
+    max_workers=settings.INFERENCE_WORKERS,
+)
+
+model_registry.add_warm_up_hook(inference_executor.warm_up)
+model_registry.add_retire_hook(inference_executor.release)
+
+inference_engine = BatchInferenceEngine(
+    executor=inference_executor,
+    max_batch_size=settings.INFERENCE_MAX_BATCH_SIZE,
+    batch_window_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+)
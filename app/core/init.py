@@ -3,7 +3,7 @@ from sqlalchemy.future import select
 from app.models.role import Role
 from app.models.user import User
 from app.models.user_role import UserRole
-from app.utils.security import get_password_hash
+from app.core.password_hasher import password_hasher
 from datetime import datetime
 import uuid
 
@@ -49,7 +49,7 @@ async def init_roles_and_admin(db: AsyncSession):
                 uuid=str(uuid.uuid4()),
                 username="admin",
                 email="admin@gmail.com",
-                password=get_password_hash("Admin@123"),
+                password=await password_hasher.hash("Admin@123"),
                 is_verified=True,
                 is_active=True,
                 is_deleted=False,
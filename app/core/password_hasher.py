@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.utils.password_utils import hash_password, needs_rehash, verify_password
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing and verification off the event loop.
+
+    The scheme and cost come from the PASSWORD_HASH_SCHEME / PASSWORD_BCRYPT_ROUNDS /
+    PASSWORD_SCRYPT_* settings. Each call takes tens to hundreds of milliseconds of CPU. They run on a small
+    dedicated thread pool (bcrypt and scrypt release the GIL), so a burst of logins occupies at most
+    `max_workers` cores and never blocks the requests sharing the event loop. At most
+    `max_pending` operations are admitted at once; callers waiting longer than
+    `queue_timeout_seconds` for a slot get a 503 instead of queueing without bound.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, queue_timeout_seconds: float):
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max(self.max_workers, max_pending)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pending)
+        return self._semaphore
+
+    async def _run(self, operation: Callable[..., Any], *args) -> Any:
+        semaphore = self._get_semaphore()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._rejected += 1
+            logger.warning(f"Rejected a password operation: {self.max_pending} already pending.")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests. Please try again shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()
+        self._in_flight += 1
+        try:
+            started_at, result = await loop.run_in_executor(self._get_executor(), _run_timed, operation, args)
+        finally:
+            self._in_flight -= 1
+            semaphore.release()
+
+        waited = started_at - submitted_at
+        self._completed += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, password: str, hashed_password: Optional[str]) -> bool:
+        # Accounts created through Google sign-in have no password
+        if not hashed_password:
+            return False
+        return await self._run(verify_password, password, hashed_password)
+
+    @staticmethod
+    def needs_rehash(hashed_password: Optional[str]) -> bool:
+        # Only parses the stored hash, so it runs inline
+        return bool(hashed_password) and needs_rehash(hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "scheme": settings.PASSWORD_HASH_SCHEME,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "average_wait_ms": round(self._total_wait / self._completed * 1000, 3) if self._completed else 0.0,
+            "max_wait_ms": round(self._max_wait * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _run_timed(operation: Callable[..., Any], args: tuple):
+    return time.monotonic(), operation(*args)
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout_seconds=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,184 @@
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# (key, capacity, refill per second) of one token bucket
+Bucket = Tuple[str, int, float]
+
+
+class RateLimitBackend(ABC):
+    """
+    Storage for token buckets.
+
+    The in-process backend limits each worker separately. Behind several workers or
+    hosts, plug in a backend over shared storage (e.g. a Redis script doing the same
+    refill-and-take atomically) with `set_rate_limit_backend`.
+    """
+
+    @abstractmethod
+    async def take(self, buckets: Sequence[Bucket]) -> float:
+        """
+        Take one token from each of `buckets`, all or none: each holds at most `capacity`
+        tokens and gains `refill_per_second`. Return 0 when the tokens were taken,
+        otherwise the seconds until every bucket has one again, leaving all untouched.
+        """
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets in a dict of key -> (tokens, last refill time).
+
+    At most `max_keys` buckets are kept; the least recently used is dropped first, which
+    only forgets a client that has been quiet the longest (its bucket would be full or
+    nearly so).
+    """
+
+    def __init__(self, max_keys: int, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max(1, max_keys)
+        self._clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    async def take(self, buckets: Sequence[Bucket]) -> float:
+        now = self._clock()
+        with self._lock:
+            levels = []
+            retry_after = 0.0
+            for key, capacity, refill_per_second in buckets:
+                tokens, updated_at = self._buckets.get(key, (capacity, now))
+                tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+                levels.append((key, tokens))
+                if tokens < 1:
+                    retry_after = max(retry_after, (1 - tokens) / refill_per_second)
+
+            for key, tokens in levels:
+                self._buckets[key] = (tokens if retry_after else tokens - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"buckets": len(self._buckets), "max_keys": self.max_keys, "evictions": self.evictions}
+
+
+_backend: RateLimitBackend = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    return _backend
+
+
+def set_rate_limit_backend(backend: RateLimitBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+class RateLimiter:
+    """
+    Throttles one group of endpoints by client IP and, when given, by account email.
+
+    Each IP may make `per_ip` requests and each email `per_email` requests per
+    `window_seconds`, with bursts up to those counts; a limit of 0 turns that check off.
+    A request is admitted only if both buckets have a token, and only then is a token
+    taken from each, so requests rejected for their email do not drain the IP allowance.
+    Call `check` first thing in the endpoint, so rejected requests cost no database,
+    hashing or email work.
+    """
+
+    def __init__(self, name: str, per_ip: int, per_email: int, window_seconds: float):
+        if per_ip < 0 or per_email < 0:
+            raise ValueError(f"Rate limits of '{name}' must be 0 (no limit) or more.")
+        if window_seconds <= 0:
+            raise ValueError(f"Rate limit window of '{name}' must be positive.")
+        self.name = name
+        self.per_ip = per_ip
+        self.per_email = per_email
+        self.window_seconds = window_seconds
+        self.allowed = 0
+        self.rejected = 0
+
+    async def check(self, request: Request, email: Optional[str] = None) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        client_ip = request.client.host if request.client else "unknown"
+        buckets = []
+        if self.per_ip:
+            buckets.append(self._bucket(f"ip:{client_ip}", self.per_ip))
+        if self.per_email and email:
+            buckets.append(self._bucket(f"email:{email.strip().lower()}", self.per_email))
+        retry_after = await get_rate_limit_backend().take(buckets) if buckets else 0.0
+
+        if retry_after:
+            self.rejected += 1
+            logger.warning(f"Rate limited {self.name} request from {client_ip}.")
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts. Please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        self.allowed += 1
+
+    def _bucket(self, key: str, capacity: int) -> Bucket:
+        return f"{self.name}:{key}", capacity, capacity / self.window_seconds
+
+    def stats(self) -> dict:
+        return {
+            "per_ip": self.per_ip,
+            "per_email": self.per_email,
+            "window_seconds": self.window_seconds,
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+# Each login runs a password hash
+login_limiter = RateLimiter(
+    "login",
+    per_ip=settings.LOGIN_RATE_LIMIT_PER_IP,
+    per_email=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+# Guesses at the six-digit verification and password reset codes
+code_check_limiter = RateLimiter(
+    "code-check",
+    per_ip=settings.CODE_RATE_LIMIT_PER_IP,
+    per_email=settings.CODE_RATE_LIMIT_PER_EMAIL,
+    window_seconds=settings.CODE_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+# Each request sends an email
+code_email_limiter = RateLimiter(
+    "code-email",
+    per_ip=settings.CODE_EMAIL_RATE_LIMIT_PER_IP,
+    per_email=settings.CODE_EMAIL_RATE_LIMIT_PER_EMAIL,
+    window_seconds=settings.CODE_EMAIL_RATE_LIMIT_WINDOW_SECONDS,
+)
+
+
+def rate_limit_stats() -> dict:
+    return {
+        "enabled": settings.RATE_LIMIT_ENABLED,
+        "backend": get_rate_limit_backend().stats(),
+        "limiters": {
+            limiter.name: limiter.stats() for limiter in (login_limiter, code_check_limiter, code_email_limiter)
+        },
+    }
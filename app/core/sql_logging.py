@@ -0,0 +1,230 @@
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """
+    Statements executed and time spent in the database while serving one request.
+
+    Statements are also counted per normalized shape, so a query issued once per item of
+    a loop (N+1) shows up as one shape repeated N times. `budget` is the most statements
+    the request may run; statements run inside `exempt_from_budget` (e.g. a periodic cache
+    refill) are timed but not held against the budget or the N+1 check.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.statements = 0
+        self.exempt_statements = 0
+        self.db_time = 0.0
+        self.budget = budget
+        self.shapes: Counter = Counter()
+        self._exempt_depth = 0
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.statements += 1
+        self.db_time += elapsed
+        if self._exempt_depth:
+            self.exempt_statements += 1
+        else:
+            self.shapes[normalize_sql(statement)] += 1
+
+    @property
+    def budgeted_statements(self) -> int:
+        return self.statements - self.exempt_statements
+
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.budgeted_statements > self.budget
+
+    def repeated_shapes(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def describe(self) -> str:
+        budget = f" (budget {self.budget})" if self.budget is not None else ""
+        return f"{self.budgeted_statements} queries{budget}, {self.db_time * 1000:.1f} ms in the database"
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.db_time * 1000:.1f};desc="{self.statements} queries"'
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _request_stats.get()
+
+
+def query_budget(max_statements: int):
+    """
+    Route dependency declaring the most statements an endpoint may run per request:
+
+        @router.get("/...", dependencies=[Depends(query_budget(4))])
+    """
+
+    def declare_budget() -> None:
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.budget = max_statements
+
+    return declare_budget
+
+
+@contextmanager
+def exempt_from_budget() -> Iterator[None]:
+    stats = _request_stats.get()
+    if stats is None:
+        yield
+        return
+    stats._exempt_depth += 1
+    try:
+        yield
+    finally:
+        stats._exempt_depth -= 1
+
+
+@contextmanager
+def track_queries(budget: Optional[int] = None) -> Iterator[QueryStats]:
+    """
+    Count the statements run inside the block, e.g. in a script or test:
+
+        with track_queries(budget=3) as stats:
+            await get_test_details(test_uuid, user_id, db)
+
+    Raises QueryBudgetExceeded when the block ran more statements than `budget`.
+    """
+    stats = QueryStats(budget)
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+    if stats.over_budget():
+        raise QueryBudgetExceeded(_budget_report(stats))
+
+
+def _budget_report(stats: QueryStats) -> str:
+    report = f"Query budget exceeded: {stats.describe()}."
+    repeated = stats.repeated_shapes(2)
+    if repeated:
+        report += " Repeated: " + "; ".join(f"{count}x {shape}" for shape, count in repeated[:3])
+    return report
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_OR_PARAM = re.compile(r"(?<![\w.:])(?:\$\d+|%\(\w+\)s|:\w+|-?\d+(?:\.\d+)?)\b")
+_VALUE_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str, max_length: int = 1000) -> str:
+    """
+    Reduce a statement to its shape: literals and bind parameters become `?`, value
+    lists collapse to `(...)` and whitespace to single spaces. Parameter values are
+    never logged.
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_OR_PARAM.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(...)", normalized)
+    normalized = _WHITESPACE.sub(" ", normalized).strip()
+    return normalized[:max_length]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {normalize_sql(statement)}")
+    elif random.random() < settings.sql_log_sample_rate:
+        logger.info(f"Query ({elapsed * 1000:.1f} ms): {normalize_sql(statement)}")
+
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute never pops its start time.
+    started_at = exception_context.connection.info.get("query_started_at") if exception_context.connection else None
+    if started_at:
+        started_at.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the statements and database time of each HTTP request.
+
+    The totals are returned in a `Server-Timing` header. Requests whose database time
+    exceeds `SQL_SLOW_REQUEST_MS`, that repeat one query shape `SQL_N_PLUS_ONE_THRESHOLD`
+    times or that run more statements than their `query_budget` are logged. With
+    `SQL_ENFORCE_QUERY_BUDGETS` on (in test and CI environments), a request over budget
+    is answered with a 500 instead, so the endpoint's test fails.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+        replaced = False
+
+        async def send_with_timing(message):
+            nonlocal replaced
+            if message["type"] == "http.response.start":
+                if settings.SQL_ENFORCE_QUERY_BUDGETS and stats.over_budget():
+                    replaced = True
+                    response = JSONResponse(status_code=500, content={"detail": _budget_report(stats)})
+                    await response(scope, receive, send)
+                    return
+                if stats.statements:
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            if not replaced:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            self._report(scope, stats)
+
+    @staticmethod
+    def _report(scope, stats: QueryStats) -> None:
+        endpoint = f"{scope['method']} {scope['path']}"
+        if stats.over_budget():
+            logger.warning(f"{endpoint}: {_budget_report(stats)}")
+        for shape, count in stats.repeated_shapes(settings.SQL_N_PLUS_ONE_THRESHOLD):
+            logger.warning(f"{endpoint}: possible N+1, {count}x {shape}")
+        if stats.db_time * 1000 >= settings.SQL_SLOW_REQUEST_MS:
+            logger.warning(f"{endpoint} was slow in the database: {stats.describe()}.")
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import re
+import time
+from typing import Callable, Dict, Optional
+
+import jose.jwt
+import jwt as pyjwt
+
+from app.core.cache import TTLCache, token_claims_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# header.payload.signature, each base64url without padding
+_JWT_SHAPE = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+$")
+MAX_TOKEN_LENGTH = 4096
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class ExpiredToken(InvalidToken):
+    pass
+
+
+def _decode_jose(token: str) -> dict:
+    try:
+        return jose.jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except jose.jwt.ExpiredSignatureError as e:
+        raise ExpiredToken(str(e))
+    except jose.JWTError as e:
+        raise InvalidToken(str(e))
+
+
+def _decode_pyjwt(token: str) -> dict:
+    try:
+        return pyjwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    except pyjwt.ExpiredSignatureError as e:
+        raise ExpiredToken(str(e))
+    except pyjwt.PyJWTError as e:
+        raise InvalidToken(str(e))
+
+
+JWT_BACKENDS: Dict[str, Callable[[str], dict]] = {"jose": _decode_jose, "pyjwt": _decode_pyjwt}
+
+
+class TokenVerifier:
+    """
+    Verifies JWTs and caches their claims until the token expires.
+
+    A client sends the same access token with every request, so only its first use pays
+    for the signature check; later ones are a digest and a cache lookup. Entries are keyed
+    by the SHA-256 of the token, so the cache never holds usable tokens, and expire at the
+    token's `exp` (capped by `max_ttl_seconds`). Strings that cannot be a JWT are rejected
+    before any decoding. The decoding library is chosen by JWT_BACKEND.
+    """
+
+    def __init__(self, cache: TTLCache, backend: str, max_ttl_seconds: float):
+        if backend not in JWT_BACKENDS:
+            raise ValueError(f"Unknown JWT backend '{backend}', expected one of {sorted(JWT_BACKENDS)}.")
+        self.cache = cache
+        self.backend = backend
+        self.max_ttl_seconds = max_ttl_seconds
+        self._decode = JWT_BACKENDS[backend]
+        self.malformed = 0
+        self.rejected = 0
+        self.wrong_type = 0
+        self.decoded = 0
+        self._decode_time = 0.0
+
+    def verify(self, token: Optional[str], token_type: str) -> dict:
+        """
+        Return the claims of a token of `token_type` ("access" or "refresh"). Raises
+        ExpiredToken or InvalidToken, also for a valid token of the other type: both are
+        signed with the same secret, so a refresh token must never pass as an access token.
+        """
+        claims = self._claims(token)
+        if claims.get("type") != token_type:
+            self.wrong_type += 1
+            raise InvalidToken(f"Expected token type '{token_type}', got '{claims.get('type')}'")
+        return dict(claims)
+
+    def _claims(self, token: Optional[str]) -> dict:
+        if not token or len(token) > MAX_TOKEN_LENGTH or not _JWT_SHAPE.match(token):
+            self.malformed += 1
+            raise InvalidToken("Malformed token")
+
+        key = hashlib.sha256(token.encode()).digest()
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+
+        started_at = time.perf_counter()
+        try:
+            claims = self._decode(token)
+        except InvalidToken:
+            self.rejected += 1
+            raise
+        finally:
+            self.decoded += 1
+            self._decode_time += time.perf_counter() - started_at
+
+        # Tokens without an expiry are never cached
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(exp - time.time(), self.max_ttl_seconds)
+            if ttl > 0:
+                self.cache.set(key, claims, ttl_seconds=ttl)
+        return claims
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "malformed": self.malformed,
+            "decoded": self.decoded,
+            "rejected": self.rejected,
+            "wrong_type": self.wrong_type,
+            "average_decode_us": round(self._decode_time / self.decoded * 1e6, 1) if self.decoded else 0.0,
+            "cache": self.cache.stats(),
+        }
+
+
+token_verifier = TokenVerifier(
+    cache=token_claims_cache,
+    backend=settings.JWT_BACKEND,
+    max_ttl_seconds=settings.TOKEN_CACHE_MAX_TTL_SECONDS,
+)
@@ -1,11 +1,14 @@
+from dataclasses import dataclass
+from typing import FrozenSet
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from app.core.config import settings
+from app.core.cache import principal_cache
+from app.core.token_verifier import InvalidToken, token_verifier
 from fastapi import Depends, HTTPException
+from sqlalchemy import and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.core.database import get_db
-from app.models import UserRole
+from app.models import Role, UserRole
 from app.models.user import User
 from sqlalchemy.orm import joinedload
 
@@ -20,13 +23,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> dict:
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # Decode JWT token
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        # Verify the JWT, or take its claims from the cache
+        payload = token_verifier.verify(token, "access")
         user_uuid: str = payload.get("sub")  # Extract the UUID
         if not user_uuid:
             raise credentials_exception
         return {"uuid": user_uuid}
-    except JWTError:
+    except InvalidToken:
         raise credentials_exception
 
 
@@ -41,4 +44,55 @@ async def get_current_user_data(
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid user")
-    return user
\ No newline at end of file
+    return user
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated user as most endpoints need it: ids and role names, nothing else.
+    """
+    id: int
+    uuid: str
+    roles: FrozenSet[str]
+    is_active: bool
+    is_verified: bool
+
+    def has_role(self, name: str) -> bool:
+        return name.upper() in self.roles
+
+    @property
+    def is_admin(self) -> bool:
+        return self.has_role("ADMIN")
+
+
+# Dependency resolving the token to a Principal, from the cache or with one narrow
+# query (one row per role)
+async def get_current_principal(
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    principal = principal_cache.get(current_user["uuid"])
+    if principal is not None:
+        return principal
+
+    stmt = (
+        select(User.id, User.uuid, User.is_active, User.is_verified, Role.name)
+        .outerjoin(UserRole, and_(UserRole.user_id == User.id, UserRole.is_deleted == False))
+        .outerjoin(Role, and_(Role.id == UserRole.role_id, Role.is_deleted == False))
+        .where(User.uuid == current_user["uuid"], User.is_deleted == False)
+    )
+    result = await db.execute(stmt)
+    rows = result.all()
+
+    if not rows:
+        raise HTTPException(status_code=401, detail="Invalid user")
+    principal = Principal(
+        id=rows[0].id,
+        uuid=rows[0].uuid,
+        roles=frozenset(row.name.upper() for row in rows if row.name),
+        is_active=bool(rows[0].is_active),
+        is_verified=bool(rows[0].is_verified),
+    )
+    principal_cache.set(principal.uuid, principal)
+    return principal
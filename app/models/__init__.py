@@ -11,8 +11,10 @@ from app.models.dimension_career import DimensionCareer
 from app.models.skill_category import SkillCategory
 from app.models.learning_style_technique_image import LearningStyleTechniqueImage
 from app.models.user_test import UserTest
+from app.models.user_test_counter import UserTestCounter
 from app.models.career import Career
 from app.models.user_feedback import UserFeedback
+from app.models.refresh_token import RefreshToken
 
 __all__ = ["Role",
            "UserRole",
@@ -27,6 +29,8 @@ __all__ = ["Role",
            "SkillCategory",
            "LearningStyleTechniqueImage",
            "UserTest",
-           "UserFeedback"
+           "UserTestCounter",
+           "UserFeedback",
+           "RefreshToken"
            ]
 
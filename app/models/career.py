@@ -11,9 +11,9 @@ class Career(Base):
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
-    personality_type_id = Column(Integer, ForeignKey("personality_types.id", ondelete="SET NULL"), nullable=True)
-    holland_code_id = Column(Integer, ForeignKey("holland_codes.id", ondelete="SET NULL"), nullable=True)
-    value_category_id = Column(Integer, ForeignKey("value_categories.id", ondelete="SET NULL"), nullable=True)
+    personality_type_id = Column(Integer, ForeignKey("personality_types.id", ondelete="SET NULL"), nullable=True, index=True)
+    holland_code_id = Column(Integer, ForeignKey("holland_codes.id", ondelete="SET NULL"), nullable=True, index=True)
+    value_category_id = Column(Integer, ForeignKey("value_categories.id", ondelete="SET NULL"), nullable=True, index=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=True, onupdate=func.now())
@@ -9,8 +9,8 @@ class DimensionCareer(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
-    dimension_id = Column(Integer, ForeignKey("dimensions.id", ondelete="CASCADE"), nullable=False)
-    career_id = Column(Integer, ForeignKey("careers.id", ondelete="CASCADE"), nullable=False)
+    dimension_id = Column(Integer, ForeignKey("dimensions.id", ondelete="CASCADE"), nullable=False, index=True)
+    career_id = Column(Integer, ForeignKey("careers.id", ondelete="CASCADE"), nullable=False, index=True)
     is_deleted = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=True, onupdate=func.now())
@@ -9,7 +9,7 @@ class PersonalityTrait(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String(36), unique=True, nullable=False)
-    personality_type_id = Column(Integer, ForeignKey("personality_types.id", ondelete="CASCADE"), nullable=False)
+    personality_type_id = Column(Integer, ForeignKey("personality_types.id", ondelete="CASCADE"), nullable=False, index=True)
     trait = Column(String(255), nullable=False)
     is_positive = Column(Boolean, nullable=False)
     is_deleted = Column(Boolean, default=False)
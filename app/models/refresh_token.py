@@ -0,0 +1,19 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String
+from app.core.database import Base
+
+
+class RefreshToken(Base):
+    """
+    One issued refresh token, stored as the SHA-256 of its `jti` claim.
+
+    Tokens rotated from the same login share a `family_id`. A token is spent once
+    `rotated_at` is set; presenting a spent token again revokes its whole family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(LargeBinary(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(36), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    rotated_at = Column(DateTime, nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -8,7 +8,7 @@ class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    uuid = Column(String, nullable=False)
+    uuid = Column(String, nullable=False, index=True)
     username = Column(String(100), unique=True, index=True)
     email = Column(String(255), unique=True, index=True)
     password = Column(String(100))
@@ -43,3 +43,16 @@ class User(Base):
     ai_recommendations = relationship("AIRecommendation", back_populates="user", cascade="all, delete-orphan")
     tests = relationship("UserTest", back_populates="user", cascade="all, delete-orphan")
     feedbacks = relationship("UserFeedback", back_populates="user", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # User listing, newest first, paged on (created_at, id)
+        Index(
+            "ix_users_listing",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=text("is_deleted = false"),
+        ),
+        # Case-insensitive prefix search on username and email
+        Index("ix_users_username_prefix", text('lower(username) COLLATE "C"')),
+        Index("ix_users_email_prefix", text('lower(email) COLLATE "C"')),
+    )
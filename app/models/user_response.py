@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSONB
@@ -9,9 +9,9 @@ class UserResponse(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String, unique=True, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     assessment_type_id = Column(Integer, ForeignKey("assessment_types.id", ondelete="CASCADE"), nullable=False)
-    user_test_id = Column(Integer, ForeignKey("user_tests.id", ondelete="CASCADE"), nullable=False)
+    user_test_id = Column(Integer, ForeignKey("user_tests.id", ondelete="CASCADE"), nullable=False, index=True)
     response_data = Column(JSONB, nullable=False)
     is_draft = Column(Boolean, default=False)
     is_deleted = Column(Boolean, default=False)
@@ -22,3 +22,19 @@ class UserResponse(Base):
     user = relationship("User", back_populates="responses")
     assessment_type = relationship("AssessmentType", back_populates="user_responses")
     user_test = relationship("UserTest", back_populates="user_responses")
+
+    __table_args__ = (
+        # Draft and submitted responses of a test are always looked up separately
+        Index(
+            "ix_user_responses_draft_by_test",
+            "user_test_id",
+            "assessment_type_id",
+            postgresql_where=text("is_deleted = false AND is_draft = true"),
+        ),
+        Index(
+            "ix_user_responses_submitted_by_test",
+            "user_test_id",
+            "assessment_type_id",
+            postgresql_where=text("is_deleted = false AND is_draft = false"),
+        ),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -11,7 +11,7 @@ class UserTest(Base):
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     name = Column(String(100), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     draft_data = Column(JSON, nullable=True)
     is_completed = Column(Boolean, default=False, nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False)
@@ -22,3 +22,14 @@ class UserTest(Base):
     user = relationship("User", back_populates="tests")
     user_responses = relationship("UserResponse", back_populates="user_test", cascade="all, delete-orphan")
     user_scores = relationship("UserAssessmentScore", back_populates="user_test", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # A user's test history, newest first, paged on (created_at, id)
+        Index(
+            "ix_user_tests_history",
+            "user_id",
+            created_at.desc(),
+            id.desc(),
+            postgresql_where=text("is_deleted = false"),
+        ),
+    )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+
+class UserTestCounter(Base):
+    """
+    Last test number handed out per user and test name prefix ("Personality", "Skills", ...).
+    """
+    __tablename__ = "user_test_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    prefix = Column(String(100), primary_key=True)
+    last_index = Column(Integer, nullable=False, default=0)
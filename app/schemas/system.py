@@ -0,0 +1,5 @@
+from pydantic import BaseModel, Field
+
+
+class ModelVersionActivateRequest(BaseModel):
+    version: str = Field(..., min_length=1, max_length=100, description="Model version directory to activate")
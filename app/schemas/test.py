@@ -20,6 +20,9 @@ class TestSummary(BaseModel):
 class UserTestsResponse(BaseModel):
     user_id: int
     tests: List[TestSummary]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last page")
+    total: Optional[int] = Field(None, description="Number of matching tests, reported on the first page only")
+    total_is_estimate: bool = Field(False, description="True when `total` is a lower bound")
 
 
 class GetTestDetailsInput(BaseModel):
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel, EmailStr, validator, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class UpdateBioDto(BaseModel):
@@ -50,6 +50,11 @@ class UserResponseDto(BaseModel):
     registered_at: Optional[datetime]
 
 
+class UserListResponseDto(BaseModel):
+    users: List[UserResponseDto]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page; null on the last page")
+
+
 class PasswordResetRequestDto(BaseModel):
     email: str
 
@@ -4,7 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.models.ai_recommendation import AIRecommendation
 from app.models.user_response import UserResponse
-from app.models.user import User
+from app.dependencies import Principal
 from app.schemas.ai_recommendation import AIRecommendationCreate
 from app.core.config import settings
 from datetime import datetime
@@ -30,7 +30,7 @@ model = genai.GenerativeModel(
 
 
 async def generate_ai_recommendation(
-    data: AIRecommendationCreate, db: AsyncSession, user: User
+    data: AIRecommendationCreate, db: AsyncSession, user: Principal
 ):
     try:
         # Fetch user responses from the database
@@ -2,24 +2,25 @@ from fastapi import HTTPException, status
 from datetime import datetime
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import jwt, JWTError
 from fastapi.responses import JSONResponse
 from datetime import timedelta
-from passlib.context import CryptContext
 import uuid
 import logging
+from ..core.cache import principal_cache
 from ..core.config import settings
 from ..models.user import User
 from ..schemas.user import UserCreateRequestDto, UserResponseDto
-from ..utils.security import get_password_hash, generate_verification_code, generate_reset_code
-from ..utils.password_utils import hash_password, validate_password, verify_password
+from ..core.password_hasher import password_hasher
+from ..core.token_verifier import InvalidToken, token_verifier
+from ..services.refresh_token import revoke_user_refresh_tokens, rotate_refresh_token
+from ..utils.security import generate_verification_code, generate_reset_code
+from ..utils.password_utils import validate_password
 from ..models.role import Role
 from ..models.user_role import UserRole
 from ..services.token import create_access_token
 
 
 logger = logging.getLogger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 
@@ -59,12 +60,12 @@ async def get_or_create_user(db: AsyncSession, user_info: dict) -> User:
 
 async def decode_jwt_token(token: str) -> str:
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+        payload = token_verifier.verify(token, "access")
         user_uuid = payload.get("sub")
         if not user_uuid:
             raise ValueError("Missing user UUID in token payload")
         return user_uuid
-    except JWTError as e:
+    except InvalidToken as e:
         logger.error(f"JWT decoding failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -122,7 +123,7 @@ async def change_password(user_uuid: str, old_password: str, new_password: str,
         )
 
     # Validate old password
-    if not verify_password(old_password, user.password):
+    if not await password_hasher.verify(old_password, user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Old password is incorrect."
@@ -130,12 +131,14 @@ async def change_password(user_uuid: str, old_password: str, new_password: str,
 
     # Validate and hash the new password
     validate_password(new_password)
-    user.password = hash_password(new_password)
+    user.password = await password_hasher.hash(new_password)
     user.updated_at = datetime.utcnow()
 
-    # Commit the changes
+    # Commit the changes, ending the sessions started with the old password
     db.add(user)
+    await revoke_user_refresh_tokens(db, user.id)
     await db.commit()
+    principal_cache.delete(user.uuid)
     return {"message": "Password updated successfully!"}
 
 
@@ -143,46 +146,24 @@ async def change_password(user_uuid: str, old_password: str, new_password: str,
 
 async def generate_new_access_token(refresh_token: str, db: AsyncSession) -> dict:
     try:
-        # Decode the refresh token to extract payload
-        payload = jwt.decode(refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_uuid = payload.get("sub")
-
-        if user_uuid is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid refresh token payload: missing user identifier.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        stmt = select(User).where(User.uuid == user_uuid)
-        result = await db.execute(stmt)
-        user = result.scalars().first()
-
-        if not user or not user.is_active:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found or inactive.",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        # Spend the refresh token and issue its successor
+        user_uuid, new_refresh_token = await rotate_refresh_token(db, refresh_token)
 
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": str(user.uuid)},
+            data={"sub": user_uuid},
             expires_delta=access_token_expires
         )
 
         return {
             "access_token": access_token,
+            "refresh_token": new_refresh_token,
             "token_type": "bearer",
             "message": "New access token generated successfully.😍",
         }
 
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired refresh token.",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -241,12 +222,13 @@ async def reset_user_password(email: str, reset_code: str, new_password: str, db
         )
 
     validate_password(new_password)
-    user.password = hash_password(new_password)
+    user.password = await password_hasher.hash(new_password)
     user.reset_password_code = None
     user.reset_password_code_expiration = None
     user.updated_at = datetime.utcnow()
 
     db.add(user)
+    await revoke_user_refresh_tokens(db, user.id)
     await db.commit()
     return {"message": "Password reset successfully!"}
 
@@ -308,6 +290,7 @@ async def verify_user(email: str, verification_code: str, db: AsyncSession):
     db.add(user)
     await db.commit()
     await db.refresh(user)
+    principal_cache.delete(user.uuid)
 
     return {"message": "User verified successfully"}
 
@@ -327,8 +310,7 @@ def set_access_cookies(response: JSONResponse, access_token: str, refresh_token:
         httponly=True,
         secure=True,
         samesite="Lax",
-        # Refresh token valid for 30 days
-        max_age=30 * 24 * 60 * 60,
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
     )
 
 def unset_jwt_cookies(response: JSONResponse):
@@ -348,13 +330,19 @@ async def validate_user_credentials(db: AsyncSession, email: str, password: str)
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    if not pwd_context.verify(password, user.password):
+    if not await password_hasher.verify(password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # The plain password is only at hand now: upgrade hashes made with an older scheme or cost
+    if password_hasher.needs_rehash(user.password):
+        user.password = await password_hasher.hash(password)
+        await db.commit()
+        logger.info(f"Rehashed the password of user {user.uuid} with the current parameters.")
+
     if not user.is_verified:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -396,7 +384,7 @@ async def register_new_user(create_user: UserCreateRequestDto, db: AsyncSession)
         uuid=str(uuid.uuid4()),
         username=create_user.username,
         email=create_user.email,
-        password=get_password_hash(create_user.password),
+        password=await password_hasher.hash(create_user.password),
         verification_code=verification_code,
         verification_code_expiration=expiration_time,
         created_at=datetime.utcnow(),
@@ -423,6 +411,7 @@ async def register_new_user(create_user: UserCreateRequestDto, db: AsyncSession)
     new_user_role = UserRole(user_id=new_user.id, role_id=user_role.id)
     db.add(new_user_role)
     await db.commit()
+    principal_cache.delete(new_user.uuid)
 
     return new_user
 
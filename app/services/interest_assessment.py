@@ -1,35 +1,101 @@
-import pandas as pd
-import uuid
-from datetime import datetime
+import asyncio
+from typing import Any, NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from fastapi import HTTPException
-from app.models.user_response import UserResponse
-from app.models.user_assessment_score import UserAssessmentScore
-from app.models.dimension import Dimension
-from app.models.holland_code import HollandCode
-from app.models.holland_key_trait import HollandKeyTrait
-from app.models.career import Career
-from app.models.assessment_type import AssessmentType
-from app.services.test import create_user_test
+from app.core.cache import prediction_cache, prediction_key
+from app.core.inference import inference_engine
+from app.services.reference_data import HollandCodeRef, ReferenceData, cached_fragment, reference_data
+from app.services.test import save_assessment_submission
 from app.schemas.interest_assessment import InterestAssessmentResponse, ChartData, DimensionDescription
+from ml_models.features import FeatureVectorBuilder
+from ml_models.flat_forest import FlatForest
 from ml_models.model_loader import load_interest_models
+from ml_models.registry import model_registry
 import logging
 import json
 
 logger = logging.getLogger(__name__)
-class_model, prob_model, label_encoder = load_interest_models()
+
+score_keys = ["R_Score", "I_Score", "A_Score", "S_Score", "E_Score", "C_Score"]
+
+
+class InterestModels(NamedTuple):
+    class_model: Any
+    prob_forest: FlatForest
+    label_encoder: Any
+    prob_features: FeatureVectorBuilder
+    class_features: FeatureVectorBuilder
+
+
+def _load_models(model_dir) -> InterestModels:
+    class_model, prob_forest, label_encoder = load_interest_models(model_dir)
+    return InterestModels(
+        class_model=class_model,
+        prob_forest=prob_forest,
+        label_encoder=label_encoder,
+        prob_features=FeatureVectorBuilder(prob_forest.feature_names),
+        class_features=FeatureVectorBuilder.for_model(class_model),
+    )
+
+
+def _predict_interest_scores(rows, version):
+    models = model_registry.get("interest", version)
+    return models.prob_forest.predict(models.prob_features.stack(rows))
+
+
+def _predict_interest_class(rows, version):
+    models = model_registry.get("interest", version)
+    return models.class_model.predict(models.class_features.frame(rows))
+
+
+model_registry.register("interest", _load_models)
+
+inference_engine.register("interest_scores", _predict_interest_scores)
+inference_engine.register("interest_class", _predict_interest_class)
 
 
 async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
-    stmt = select(AssessmentType.id).where(AssessmentType.name == name)
-    result = await db.execute(stmt)
-    assessment_type_id = result.scalars().first()
+    refs = await reference_data.get(db)
+    assessment_type_id = refs.get_assessment_type_id(name)
     if not assessment_type_id:
         raise HTTPException(status_code=404, detail=f"Assessment type '{name}' not found.")
     return assessment_type_id
 
 
+def _holland_code_fragment(refs: ReferenceData, holland_code: HollandCodeRef) -> dict:
+    # Code details, key traits and career paths only depend on the predicted Holland code
+    return {
+        "holland_code": holland_code.code,
+        "type_name": holland_code.type,
+        "description": holland_code.description,
+        "key_traits": list(holland_code.key_traits),
+        "career_path": list(refs.careers_by_holland_code_id.get(holland_code.id, ())),
+    }
+
+
+async def _predict_interest(models: InterestModels, model_version: str, responses: dict):
+    """
+    Return the interest scores and the decoded Holland code, memoized per model version.
+    """
+    prob_input = models.prob_features.build(responses)
+    class_input = models.class_features.build(responses)
+    cache_key = prediction_key("interest", model_version, prob_input, class_input)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Predict scores and class
+    prob_predictions, class_prediction = await asyncio.gather(
+        inference_engine.predict("interest_scores", prob_input, model_version),
+        inference_engine.predict("interest_class", class_input, model_version),
+    )
+    predicted_class = models.label_encoder.inverse_transform([class_prediction])[0]
+
+    prediction = (prob_predictions, predicted_class)
+    prediction_cache.set(cache_key, prediction)
+    return prediction
+
+
 async def process_interest_assessment(
     responses: dict,
     db: AsyncSession,
@@ -37,40 +103,26 @@ async def process_interest_assessment(
 ) -> InterestAssessmentResponse:
 
     try:
-        user_test = await create_user_test(db, current_user.id, "Interest")
-
         assessment_type_id = await get_assessment_type_id("Interests", db)
+        refs = await reference_data.get(db)
+        # Pin the model version until the predictions are done, even if it is swapped meanwhile
+        with model_registry.pinned() as model_version:
+            models = await model_registry.get_async("interest", model_version)
 
-        # Predict scores and class
-        input_data = pd.DataFrame([responses])
-        input_data_prob = input_data.reindex(columns=prob_model.feature_names_in_, fill_value=0)
-        prob_predictions = prob_model.predict(input_data_prob)
-
-        prob_scores = pd.DataFrame(
-            prob_predictions,
-            columns=["R_Score", "I_Score", "A_Score", "S_Score", "E_Score", "C_Score"],
-        )
-
-        input_data_class = input_data.reindex(columns=class_model.feature_names_in_, fill_value=0)
-        class_predictions = class_model.predict(input_data_class)
-        predicted_class = label_encoder.inverse_transform(class_predictions)[0]
+            prob_predictions, predicted_class = await _predict_interest(models, model_version, responses)
+        prob_scores = dict(zip(score_keys, prob_predictions))
+        total_prob_score = prob_predictions.sum()
 
         # Fetch Holland Code and Key Traits
-        holland_code_query = select(HollandCode).where(HollandCode.code == predicted_class)
-        result = await db.execute(holland_code_query)
-        holland_code = result.scalars().first()
+        holland_code = refs.holland_codes.get(predicted_class)
 
         if not holland_code:
             raise HTTPException(status_code=400, detail="Holland code not found for the predicted class.")
 
-        key_traits_query = select(HollandKeyTrait).where(HollandKeyTrait.holland_code_id == holland_code.id)
-        key_traits_result = await db.execute(key_traits_query)
-        key_traits = [trait.key_trait for trait in key_traits_result.scalars().all()]
-
-        # Fetch Career Paths from Career Table
-        career_query = select(Career).where(Career.holland_code_id == holland_code.id)
-        career_result = await db.execute(career_query)
-        career_paths = [career.name for career in career_result.scalars().all()]
+        # Key traits and career paths are built once per Holland code
+        fragment = cached_fragment(
+            refs, "interest", holland_code.code, lambda: _holland_code_fragment(refs, holland_code)
+        )
 
         # Mapping Scores to Dimensions
         key_to_dimension = {
@@ -86,15 +138,13 @@ async def process_interest_assessment(
         dimension_descriptions = []
         assessment_scores = []
 
-        for score_key, score_value in prob_scores.iloc[0].items():
+        for score_key, score_value in prob_scores.items():
             dimension_name = key_to_dimension.get(score_key)
             if not dimension_name:
                 logger.warning(f"Unmapped score key: {score_key}. Skipping.")
                 continue
 
-            dimension_query = select(Dimension).where(Dimension.name == dimension_name)
-            result = await db.execute(dimension_query)
-            dimension = result.scalars().first()
+            dimension = refs.dimensions.get(dimension_name)
 
             if not dimension:
                 logger.error(f"Dimension not found for {dimension_name}. Skipping.")
@@ -107,21 +157,14 @@ async def process_interest_assessment(
                 "score": score_value,
             })
 
-            percentage = round((score_value / prob_scores.iloc[0].sum()) * 100, 2)
-            assessment_scores.append(
-                UserAssessmentScore(
-                    uuid=str(uuid.uuid4()),
-                    user_id=current_user.id,
-                    user_test_id=user_test.id,
-                    assessment_type_id=assessment_type_id,
-                    dimension_id=dimension.id,
-                    score={
-                        "score": round(score_value, 2),
-                        "percentage": percentage,
-                    },
-                    created_at=datetime.utcnow(),
-                )
-            )
+            percentage = round((score_value / total_prob_score) * 100, 2)
+            assessment_scores.append({
+                "dimension_id": dimension.id,
+                "score": {
+                    "score": round(score_value, 2),
+                    "percentage": percentage,
+                },
+            })
 
         if not assessment_scores:
             logger.error("No assessment scores to save.")
@@ -130,17 +173,11 @@ async def process_interest_assessment(
                 detail="Failed to resolve dimension IDs for interest assessment scores.",
             )
 
-        db.add_all(assessment_scores)
-
         top_dimensions = sorted(dimension_descriptions, key=lambda x: x["score"], reverse=True)[:2]
 
-        response = InterestAssessmentResponse(
+        response = InterestAssessmentResponse.model_construct(
             user_id=current_user.uuid,
-            holland_code=holland_code.code,
-            type_name=holland_code.type,
-            description=holland_code.description,
-            key_traits=key_traits,
-            career_path=career_paths,
+            **fragment,
             chart_data=chart_data,
             dimension_descriptions=[
                 DimensionDescription(
@@ -151,17 +188,15 @@ async def process_interest_assessment(
             ],
         )
 
-        user_response = UserResponse(
-            uuid=str(uuid.uuid4()),
+        # Save the test, scores and user response in one transaction
+        await save_assessment_submission(
+            db,
             user_id=current_user.id,
-            user_test_id=user_test.id,
             assessment_type_id=assessment_type_id,
+            test_name_prefix="Interest",
+            scores=assessment_scores,
             response_data=json.dumps(response.dict()),
-            created_at=datetime.utcnow(),
         )
-        db.add(user_response)
-
-        await db.commit()
         return response
 
     except Exception as e:
@@ -1,31 +1,89 @@
-import pandas as pd
-import uuid
-from datetime import datetime
+from typing import NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
 
-from app.models import AssessmentType
-from app.models.user_response import UserResponse
-from app.models.user_assessment_score import UserAssessmentScore
-from app.models.learning_style_study_technique import LearningStyleStudyTechnique
-from app.models.dimension import Dimension
-from app.models.question import Question
-from app.models.dimension_career import DimensionCareer
-from app.schemas.learning_style_assessment import LearningStyleInput, LearningStyleChart, LearningStyleResponse
-from app.services.test import create_user_test
+from app.core.cache import prediction_cache, prediction_key
+from app.core.inference import inference_engine
+from app.schemas.learning_style_assessment import (
+    DimensionDetail,
+    LearningStyleInput,
+    LearningStyleChart,
+    LearningStyleResponse,
+)
+from app.services.reference_data import ReferenceData, cached_fragment, reference_data
+from app.services.test import save_assessment_submission
+from ml_models.features import FeatureVectorBuilder
+from ml_models.flat_forest import FlatForest
 from ml_models.model_loader import load_vark_model
+from ml_models.registry import model_registry
 import logging
 import json
 
 logger = logging.getLogger(__name__)
-vark_model = load_vark_model()
+
+style_keys = ["Visual_Score", "Auditory_Score", "ReadWrite_Score", "Kinesthetic_Score"]
+
+
+class LearningStyleModels(NamedTuple):
+    vark_forest: FlatForest
+    vark_features: FeatureVectorBuilder
+
+
+def _load_models(model_dir) -> LearningStyleModels:
+    vark_forest = load_vark_model(model_dir)
+    return LearningStyleModels(vark_forest, FeatureVectorBuilder(vark_forest.feature_names))
+
+
+def _predict_vark_scores(rows, version):
+    models = model_registry.get("learning_style", version)
+    return models.vark_forest.predict(models.vark_features.stack(rows))
+
+
+model_registry.register("learning_style", _load_models)
+
+
+inference_engine.register("learning_style", _predict_vark_scores)
+
+
+def _learning_style_fragment(refs: ReferenceData) -> dict:
+    # Dimension details, study techniques and related careers are the same for every submission
+    dimension_details = []
+    related_careers = []
+
+    for style in style_keys:
+        dimension = refs.dimensions.get(style.replace("_Score", ""))
+        if not dimension:
+            continue
+
+        techniques = refs.techniques_by_dimension_id.get(dimension.id, ())
+        careers = refs.careers_by_dimension_id.get(dimension.id, ())
+
+        related_careers.extend({"career_name": career} for career in careers)
+
+        dimension_details.append(
+            DimensionDetail(
+                dimension_name=dimension.name,
+                dimension_description=dimension.description,
+                techniques=[
+                    {
+                        "technique_name": t.technique_name,
+                        "category": t.category,
+                        "description": t.description,
+                    }
+                    for t in techniques
+                ],
+            )
+        )
+
+    return {
+        "dimensions": dimension_details,
+        "related_careers": list({c["career_name"]: c for c in related_careers}.values()),
+    }
+
 
 async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
-    stmt = select(AssessmentType.id).where(AssessmentType.name == name)
-    result = await db.execute(stmt)
-    assessment_type_id = result.scalars().first()
+    refs = await reference_data.get(db)
+    assessment_type_id = refs.get_assessment_type_id(name)
 
     if not assessment_type_id:
         raise HTTPException(status_code=404, detail=f"Assessment type '{name}' not found.")
@@ -41,11 +99,8 @@ async def predict_learning_style(
     try:
         assessment_type_id = await get_assessment_type_id("Learning Style", db)
 
-        user_test = await create_user_test(db, current_user.id, "Learning Style")
-
-        stmt = select(Question).options(joinedload(Question.dimension))
-        result = await db.execute(stmt)
-        questions = result.scalars().all()
+        refs = await reference_data.get(db)
+        questions = refs.questions
 
         normalized_answers = {key.replace("/", ""): value for key, value in data.responses.items()}
 
@@ -53,14 +108,14 @@ async def predict_learning_style(
         missing_questions = []
 
         for question in questions:
-            if not question.dimension:
+            if not question.dimension_name:
                 logger.error(f"Dimension missing for question ID {question.id}")
                 raise HTTPException(
                     status_code=500,
                     detail=f"Dimension missing for question ID {question.id}",
                 )
 
-            question_key = f"Q{question.id}_{question.dimension.name.replace('/', '')}"
+            question_key = f"Q{question.id}_{question.dimension_name.replace('/', '')}"
 
             answer = normalized_answers.get(question_key)
             if answer is not None:
@@ -72,22 +127,23 @@ async def predict_learning_style(
         if missing_questions:
             logger.warning(f"Missing answers for questions: {missing_questions}")
 
-        input_data = pd.DataFrame([input_data_dict]).reindex(
-            columns=vark_model.feature_names_in_, fill_value=0
-        )
-        predicted_scores = vark_model.predict(input_data)
+        # Pin the model version until the predictions are done, even if it is swapped meanwhile
+        with model_registry.pinned() as model_version:
+            models = await model_registry.get_async("learning_style", model_version)
+            vark_input = models.vark_features.build(input_data_dict)
 
-        predicted_probs_df = pd.DataFrame(
-            predicted_scores,
-            columns=["Visual_Score", "Auditory_Score", "ReadWrite_Score", "Kinesthetic_Score"],
-        )
+            # Identical answer sets always produce the same scores for a model version
+            cache_key = prediction_key("learning_style", model_version, vark_input)
+            predicted_scores = prediction_cache.get(cache_key)
+            if predicted_scores is None:
+                predicted_scores = await inference_engine.predict("learning_style", vark_input, model_version)
+                prediction_cache.set(cache_key, predicted_scores)
 
-        total_score = predicted_probs_df.sum(axis=1).iloc[0]
-        predicted_probs_df = predicted_probs_df.div(total_score, axis=1)
+        total_score = predicted_scores.sum()
+        row = dict(zip(style_keys, predicted_scores / total_score))
 
-        row = predicted_probs_df.iloc[0]
-        learning_style = row.idxmax().replace("_Score", "")
-        max_prob = row.max()
+        learning_style = max(row, key=row.get).replace("_Score", "")
+        max_prob = max(row.values())
 
         chart_data = {
             "labels": ["Visual Learning", "Auditory Learning", "Read/Write Learning", "Kinesthetic Learning"],
@@ -100,91 +156,42 @@ async def predict_learning_style(
         }
 
         assessment_scores = []
-        dimension_details = []
-        related_careers = []
 
         for style, prob in row.items():
             dimension_name = style.replace("_Score", "")
-            dimension_stmt = select(Dimension).where(Dimension.name == dimension_name)
-            dimension = await db.execute(dimension_stmt)
-            dimension = dimension.scalars().first()
+            dimension = refs.dimensions.get(dimension_name)
 
             if dimension:
                 percentage = round(prob * 100, 2)
-                assessment_scores.append(
-                    UserAssessmentScore(
-                        uuid=str(uuid.uuid4()),
-                        user_id=current_user.id,
-                        user_test_id=user_test.id,
-                        assessment_type_id=assessment_type_id,
-                        dimension_id=dimension.id,
-                        score={
-                            "score": round(prob, 2),
-                            "percentage": percentage
-                        },
-                        created_at=datetime.utcnow(),
-                    )
-                )
-
-                techniques_stmt = select(LearningStyleStudyTechnique).where(
-                    LearningStyleStudyTechnique.dimension_id == dimension.id,
-                    LearningStyleStudyTechnique.is_deleted == False,
-                )
-                techniques = await db.execute(techniques_stmt)
-                techniques = techniques.scalars().all()
-
-                careers_stmt = (
-                    select(DimensionCareer)
-                    .options(joinedload(DimensionCareer.career))
-                    .where(DimensionCareer.dimension_id == dimension.id)
-                )
-                careers = await db.execute(careers_stmt)
-                careers = careers.scalars().all()
-
-                related_careers.extend(
-                    {"career_name": career.career.name} for career in careers if career.career
-                )
-
-                dimension_details.append(
-                    {
-                        "dimension_name": dimension.name,
-                        "dimension_description": dimension.description,
-                        "techniques": [
-                            {
-                                "technique_name": t.technique_name,
-                                "category": t.category,
-                                "description": t.description,
-                            }
-                            for t in techniques
-                        ],
-                    }
-                )
-
-        db.add_all(assessment_scores)
-
-        unique_careers = list({c["career_name"]: c for c in related_careers}.values())
-
-        response = LearningStyleResponse(
+                assessment_scores.append({
+                    "dimension_id": dimension.id,
+                    "score": {
+                        "score": round(prob, 2),
+                        "percentage": percentage
+                    },
+                })
+
+        # Techniques and careers per style are built once per reference data version
+        fragment = cached_fragment(refs, "learning_style", None, lambda: _learning_style_fragment(refs))
+
+        response = LearningStyleResponse.model_construct(
             user_id=current_user.uuid,
             learning_style=learning_style,
             probability=round(max_prob * 100, 2),
-            details=row.to_dict(),
+            details={style: float(prob) for style, prob in row.items()},
             chart=LearningStyleChart(labels=chart_data["labels"], values=chart_data["values"]),
-            dimensions=dimension_details,
-            related_careers=unique_careers,
+            **fragment,
         )
 
-        user_responses = UserResponse(
-            uuid=str(uuid.uuid4()),
+        # Save the test, scores and user response in one transaction
+        await save_assessment_submission(
+            db,
             user_id=current_user.id,
-            user_test_id=user_test.id,
             assessment_type_id=assessment_type_id,
+            test_name_prefix="Learning Style",
+            scores=assessment_scores,
             response_data=json.dumps(response.dict()),
-            created_at=datetime.utcnow(),
         )
-        db.add(user_responses)
-
-        await db.commit()
 
         return response.dict()
 
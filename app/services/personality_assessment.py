@@ -1,42 +1,112 @@
-import pandas as pd
-import uuid
-from datetime import datetime
+from typing import Any, NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from fastapi import HTTPException
-from app.models import AssessmentType
-from app.models.user_response import UserResponse
-from app.models.user_assessment_score import UserAssessmentScore
-from app.models.dimension import Dimension
-from app.models.personality_type import PersonalityType
-from app.models.personality_trait import PersonalityTrait
-from app.models.personality_strength import PersonalityStrength
-from app.models.personality_weakness import PersonalityWeakness
-from app.models.career import Career
-from app.services.test import create_user_test
+from app.core.cache import prediction_cache, prediction_key
+from app.core.inference import inference_engine
+from app.services.reference_data import PersonalityTypeRef, ReferenceData, cached_fragment, reference_data
+from app.services.test import save_assessment_submission
 from app.schemas.personality_assessment import (
     PersonalityAssessmentResponse,
     PersonalityTypeDetails,
     DimensionScore,
     PersonalityTraits,
 )
+from ml_models.features import FeatureMismatch, FeatureVectorBuilder
+from ml_models.flat_forest import FlatForest
 from ml_models.model_loader import load_personality_models
+from ml_models.registry import model_registry
 import logging
 import json
 
 logger = logging.getLogger(__name__)
-dimension_models, personality_predictor, label_encoder = load_personality_models()
+
+
+class PersonalityModels(NamedTuple):
+    dimension_forest: FlatForest
+    personality_predictor: Any
+    label_encoder: Any
+    response_features: FeatureVectorBuilder
+    dimension_features: FeatureVectorBuilder
+
+
+def _load_models(model_dir) -> PersonalityModels:
+    dimension_forest, personality_predictor, label_encoder = load_personality_models(model_dir)
+    return PersonalityModels(
+        dimension_forest=dimension_forest,
+        personality_predictor=personality_predictor,
+        label_encoder=label_encoder,
+        response_features=FeatureVectorBuilder(dimension_forest.feature_names),
+        dimension_features=FeatureVectorBuilder.for_model(personality_predictor),
+    )
+
+
+def _predict_dimension_scores(rows, version):
+    models = model_registry.get("personality", version)
+    return models.dimension_forest.predict(models.response_features.stack(rows))
+
+
+def _predict_personality_type(rows, version):
+    models = model_registry.get("personality", version)
+    return models.personality_predictor.predict(models.dimension_features.frame(rows))
+
+
+model_registry.register("personality", _load_models)
+
+
+inference_engine.register("personality_dimensions", _predict_dimension_scores)
+inference_engine.register("personality_type", _predict_personality_type)
 
 
 async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
-    stmt = select(AssessmentType.id).where(AssessmentType.name == name)
-    result = await db.execute(stmt)
-    assessment_type_id = result.scalars().first()
+    refs = await reference_data.get(db)
+    assessment_type_id = refs.get_assessment_type_id(name)
     if not assessment_type_id:
         raise HTTPException(status_code=404, detail=f"Assessment type '{name}' not found.")
     return assessment_type_id
 
 
+def _personality_fragment(refs: ReferenceData, personality_details: PersonalityTypeRef) -> dict:
+    # Type details, traits, strengths, weaknesses and careers only depend on the predicted type
+    return {
+        "personality_type": PersonalityTypeDetails(
+            name=personality_details.name,
+            title=personality_details.title,
+            description=personality_details.description,
+        ),
+        "traits": PersonalityTraits(
+            positive=list(personality_details.positive_traits),
+            negative=list(personality_details.negative_traits),
+        ),
+        "strengths": list(personality_details.strengths),
+        "weaknesses": list(personality_details.weaknesses),
+        "career_recommendations": list(refs.careers_by_holland_code_id.get(personality_details.id, ())),
+    }
+
+
+async def _predict_personality(models: PersonalityModels, model_version: str, responses):
+    """
+    Return the dimension scores and the decoded personality type, memoized per model version.
+    """
+    cache_key = prediction_key("personality", model_version, responses)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Calculate dimension scores
+    dimension_predictions = await inference_engine.predict("personality_dimensions", responses, model_version)
+    dimension_scores = dict(zip(models.dimension_forest.output_names, dimension_predictions))
+
+    # Predict personality type
+    predicted_class = await inference_engine.predict(
+        "personality_type", models.dimension_features.build(dimension_scores, strict=True), model_version
+    )
+    predicted_personality = models.label_encoder.inverse_transform([predicted_class])[0]
+
+    prediction = (dimension_scores, predicted_personality)
+    prediction_cache.set(cache_key, prediction)
+    return prediction
+
+
 async def process_personality_assessment(
     input_data: dict,
     db: AsyncSession,
@@ -44,16 +114,18 @@ async def process_personality_assessment(
 ) -> PersonalityAssessmentResponse:
 
     try:
-        user_test = await create_user_test(db, current_user.id, "Personality")
-
         assessment_type_id = await get_assessment_type_id("Personality", db)
+        refs = await reference_data.get(db)
+        # Pin the model version until the predictions are done, even if it is swapped meanwhile
+        with model_registry.pinned() as model_version:
+            models = await model_registry.get_async("personality", model_version)
+
+            try:
+                responses = models.response_features.build(input_data, strict=True)
+            except FeatureMismatch as e:
+                raise HTTPException(status_code=422, detail=str(e))
 
-        # Calculate dimension scores
-        input_responses_df = pd.DataFrame([input_data])
-        dimension_scores = {}
-        for dimension, model in dimension_models.items():
-            prediction = model.predict(input_responses_df)[0]
-            dimension_scores[dimension] = prediction
+            dimension_scores, predicted_personality = await _predict_personality(models, model_version, responses)
 
         total_score = sum(dimension_scores.values())
         normalized_scores = {
@@ -64,40 +136,21 @@ async def process_personality_assessment(
             for dim, score in dimension_scores.items()
         }
 
-        # Predict personality type
-        input_data_for_prediction = pd.DataFrame([dimension_scores])
-        predicted_class = personality_predictor.predict(input_data_for_prediction)
-        predicted_personality = label_encoder.inverse_transform(predicted_class)[0]
-
-        personality_query = select(PersonalityType).where(PersonalityType.name == predicted_personality)
-        result = await db.execute(personality_query)
-        personality_details = result.scalars().first()
+        personality_details = refs.personality_types.get(predicted_personality)
 
         if not personality_details:
             raise HTTPException(status_code=400, detail="Personality details not found for the predicted class.")
 
-        # Save assessment scores
+        # Assessment scores to save
         assessment_scores = []
         for dimension_name, score_data in normalized_scores.items():
-            dimension_query = select(Dimension).where(Dimension.name == dimension_name)
-            result = await db.execute(dimension_query)
-            dimension = result.scalars().first()
+            dimension = refs.dimensions.get(dimension_name)
 
             if not dimension:
                 logger.warning(f"Dimension not found for {dimension_name}. Skipping.")
                 continue
 
-            assessment_scores.append(
-                UserAssessmentScore(
-                    uuid=str(uuid.uuid4()),
-                    user_id=current_user.id,
-                    user_test_id=user_test.id,
-                    assessment_type_id=assessment_type_id,
-                    dimension_id=dimension.id,
-                    score=score_data,
-                    created_at=datetime.utcnow(),
-                )
-            )
+            assessment_scores.append({"dimension_id": dimension.id, "score": score_data})
 
         if not assessment_scores:
             raise HTTPException(
@@ -105,37 +158,15 @@ async def process_personality_assessment(
                 detail="Failed to resolve dimension IDs for personality assessment scores.",
             )
 
-        db.add_all(assessment_scores)
-
-        # Fetch personality traits
-        traits_query = select(PersonalityTrait).where(PersonalityTrait.personality_type_id == personality_details.id)
-        traits_result = await db.execute(traits_query)
-        traits = traits_result.scalars().all()
-        positive_traits = [trait.trait for trait in traits if trait.is_positive]
-        negative_traits = [trait.trait for trait in traits if not trait.is_positive]
-
-        # Fetch strengths and weaknesses
-        strengths_query = select(PersonalityStrength).where(PersonalityStrength.personality_type_id == personality_details.id)
-        strengths_result = await db.execute(strengths_query)
-        strengths = [s.strength for s in strengths_result.scalars().all()]
-
-        weaknesses_query = select(PersonalityWeakness).where(PersonalityWeakness.personality_type_id == personality_details.id)
-        weaknesses_result = await db.execute(weaknesses_query)
-        weaknesses = [w.weakness for w in weaknesses_result.scalars().all()]
-
-        # Fetch careers from career table
-        career_query = select(Career).where(Career.holland_code_id == personality_details.id)
-        career_result = await db.execute(career_query)
-        careers = [career.name for career in career_result.scalars().all()]
+        # The static part of the response is built once per personality type
+        fragment = cached_fragment(
+            refs, "personality", personality_details.name,
+            lambda: _personality_fragment(refs, personality_details),
+        )
 
-        # Construct the response
-        response = PersonalityAssessmentResponse(
+        # Construct the response; the cached fragment is already validated
+        response = PersonalityAssessmentResponse.model_construct(
             user_uuid=current_user.uuid,
-            personality_type=PersonalityTypeDetails(
-                name=personality_details.name,
-                title=personality_details.title,
-                description=personality_details.description,
-            ),
             dimensions=[
                 DimensionScore(
                     dimension_name=dim,
@@ -144,27 +175,23 @@ async def process_personality_assessment(
                 )
                 for dim, data in normalized_scores.items()
             ],
-            traits=PersonalityTraits(positive=positive_traits, negative=negative_traits),
-            strengths=strengths,
-            weaknesses=weaknesses,
-            career_recommendations=careers,
+            **fragment,
         )
 
-        # Save user response
-        user_response = UserResponse(
-            uuid=str(uuid.uuid4()),
+        # Save the test, scores and user response in one transaction
+        await save_assessment_submission(
+            db,
             user_id=current_user.id,
-            user_test_id=user_test.id,
             assessment_type_id=assessment_type_id,
+            test_name_prefix="Personality",
+            scores=assessment_scores,
             response_data=json.dumps(response.dict()),
-            created_at=datetime.utcnow(),
         )
-        db.add(user_response)
-
-        await db.commit()
 
         return response
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.exception("An error occurred during personality assessment.")
         await db.rollback()
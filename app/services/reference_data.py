@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.sql_logging import exempt_from_budget
+from app.models import (
+    AssessmentType,
+    Career,
+    Dimension,
+    DimensionCareer,
+    LearningStyleStudyTechnique,
+    SkillCategory,
+)
+from app.models.holland_code import HollandCode
+from app.models.holland_key_trait import HollandKeyTrait
+from app.models.personality_strength import PersonalityStrength
+from app.models.personality_trait import PersonalityTrait
+from app.models.personality_type import PersonalityType
+from app.models.personality_weakness import PersonalityWeakness
+from app.models.question import Question
+from app.models.value_category import ValueCategory
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DimensionRef:
+    id: int
+    name: str
+    description: Optional[str]
+
+
+@dataclass(frozen=True)
+class PersonalityTypeRef:
+    id: int
+    name: str
+    title: str
+    description: str
+    positive_traits: Tuple[str, ...]
+    negative_traits: Tuple[str, ...]
+    strengths: Tuple[str, ...]
+    weaknesses: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class HollandCodeRef:
+    id: int
+    code: str
+    type: str
+    description: str
+    key_traits: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ValueCategoryRef:
+    id: int
+    name: str
+    definition: str
+    characteristics: str
+
+
+@dataclass(frozen=True)
+class TechniqueRef:
+    technique_name: str
+    category: str
+    description: Optional[str]
+
+
+@dataclass(frozen=True)
+class QuestionRef:
+    id: int
+    question_text: str
+    dimension_name: Optional[str]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """
+    Immutable snapshot of the static lookup tables used by the assessment services.
+    """
+    version: int
+    loaded_at: float
+    assessment_type_ids: Dict[str, int] = field(default_factory=dict)
+    dimensions: Dict[str, DimensionRef] = field(default_factory=dict)
+    personality_types: Dict[str, PersonalityTypeRef] = field(default_factory=dict)
+    holland_codes: Dict[str, HollandCodeRef] = field(default_factory=dict)
+    value_categories: Dict[str, ValueCategoryRef] = field(default_factory=dict)
+    careers_by_holland_code_id: Dict[int, Tuple[str, ...]] = field(default_factory=dict)
+    careers_by_value_category_id: Dict[int, Tuple[str, ...]] = field(default_factory=dict)
+    careers_by_dimension_id: Dict[int, Tuple[str, ...]] = field(default_factory=dict)
+    skill_categories_by_dimension_id: Dict[int, str] = field(default_factory=dict)
+    techniques_by_dimension_id: Dict[int, Tuple[TechniqueRef, ...]] = field(default_factory=dict)
+    questions: Tuple[QuestionRef, ...] = ()
+
+    def get_assessment_type_id(self, name: str) -> Optional[int]:
+        return self.assessment_type_ids.get(name)
+
+
+def _group(rows, key, value) -> Dict[int, Tuple]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[key(row)].append(value(row))
+    return {k: tuple(v) for k, v in grouped.items()}
+
+
+def _first_by(rows, key, value) -> Dict:
+    # Rows come ordered by id, so when a name repeats the oldest row wins
+    indexed = {}
+    for row in rows:
+        indexed.setdefault(key(row), value(row))
+    return indexed
+
+
+async def _scalars(db: AsyncSession, stmt) -> list:
+    result = await db.execute(stmt)
+    return result.scalars().all()
+
+
+async def _load_snapshot(db: AsyncSession, version: int) -> ReferenceData:
+    assessment_types = await _scalars(db, select(AssessmentType).order_by(AssessmentType.id))
+    dimensions = await _scalars(db, select(Dimension).order_by(Dimension.id))
+    personality_types = await _scalars(db, select(PersonalityType).order_by(PersonalityType.id))
+    traits = await _scalars(db, select(PersonalityTrait).order_by(PersonalityTrait.id))
+    strengths = await _scalars(db, select(PersonalityStrength).order_by(PersonalityStrength.id))
+    weaknesses = await _scalars(db, select(PersonalityWeakness).order_by(PersonalityWeakness.id))
+    holland_codes = await _scalars(db, select(HollandCode).order_by(HollandCode.id))
+    key_traits = await _scalars(db, select(HollandKeyTrait).order_by(HollandKeyTrait.id))
+    value_categories = await _scalars(
+        db, select(ValueCategory).where(ValueCategory.is_deleted == False).order_by(ValueCategory.id)
+    )
+    careers = await _scalars(db, select(Career).order_by(Career.id))
+    dimension_careers = await _scalars(db, select(DimensionCareer).order_by(DimensionCareer.id))
+    skill_categories = await _scalars(db, select(SkillCategory).order_by(SkillCategory.id))
+    techniques = await _scalars(
+        db,
+        select(LearningStyleStudyTechnique)
+        .where(LearningStyleStudyTechnique.is_deleted == False)
+        .order_by(LearningStyleStudyTechnique.id),
+    )
+    questions = await _scalars(db, select(Question).order_by(Question.id))
+
+    dimension_names = {d.id: d.name for d in dimensions}
+    career_names = {c.id: c.name for c in careers}
+
+    traits_by_type = _group(traits, lambda t: t.personality_type_id, lambda t: t)
+    strengths_by_type = _group(strengths, lambda s: s.personality_type_id, lambda s: s.strength)
+    weaknesses_by_type = _group(weaknesses, lambda w: w.personality_type_id, lambda w: w.weakness)
+    key_traits_by_code = _group(key_traits, lambda t: t.holland_code_id, lambda t: t.key_trait)
+
+    return ReferenceData(
+        version=version,
+        loaded_at=time.monotonic(),
+        assessment_type_ids=_first_by(assessment_types, lambda a: a.name, lambda a: a.id),
+        dimensions=_first_by(
+            dimensions, lambda d: d.name, lambda d: DimensionRef(id=d.id, name=d.name, description=d.description)
+        ),
+        personality_types=_first_by(
+            personality_types,
+            lambda p: p.name,
+            lambda p: PersonalityTypeRef(
+                id=p.id,
+                name=p.name,
+                title=p.title,
+                description=p.description,
+                positive_traits=tuple(t.trait for t in traits_by_type.get(p.id, ()) if t.is_positive),
+                negative_traits=tuple(t.trait for t in traits_by_type.get(p.id, ()) if not t.is_positive),
+                strengths=strengths_by_type.get(p.id, ()),
+                weaknesses=weaknesses_by_type.get(p.id, ()),
+            ),
+        ),
+        holland_codes=_first_by(
+            holland_codes,
+            lambda c: c.code,
+            lambda c: HollandCodeRef(
+                id=c.id,
+                code=c.code,
+                type=c.type,
+                description=c.description,
+                key_traits=key_traits_by_code.get(c.id, ()),
+            ),
+        ),
+        value_categories=_first_by(
+            value_categories,
+            lambda v: v.name,
+            lambda v: ValueCategoryRef(
+                id=v.id, name=v.name, definition=v.definition, characteristics=v.characteristics
+            ),
+        ),
+        careers_by_holland_code_id=_group(
+            [c for c in careers if c.holland_code_id is not None], lambda c: c.holland_code_id, lambda c: c.name
+        ),
+        careers_by_value_category_id=_group(
+            [c for c in careers if c.value_category_id is not None], lambda c: c.value_category_id, lambda c: c.name
+        ),
+        careers_by_dimension_id=_group(
+            [dc for dc in dimension_careers if dc.career_id in career_names],
+            lambda dc: dc.dimension_id,
+            lambda dc: career_names[dc.career_id],
+        ),
+        skill_categories_by_dimension_id=_first_by(
+            skill_categories, lambda c: c.dimension_id, lambda c: c.category_name
+        ),
+        techniques_by_dimension_id=_group(
+            techniques,
+            lambda t: t.dimension_id,
+            lambda t: TechniqueRef(technique_name=t.technique_name, category=t.category, description=t.description),
+        ),
+        questions=tuple(
+            QuestionRef(id=q.id, question_text=q.question_text, dimension_name=dimension_names.get(q.dimension_id))
+            for q in questions
+        ),
+    )
+
+
+class ReferenceDataCache:
+    """
+    Read-through, versioned cache of the reference tables.
+
+    The snapshot is loaded once (normally at startup) and reloaded when it is older
+    than `ttl_seconds` or after `invalidate()` has been called. Readers always get a
+    complete, immutable snapshot; a reload never mutates one that is in use.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._snapshot: Optional[ReferenceData] = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version if self._snapshot else 0
+
+    def _is_fresh(self, snapshot: Optional[ReferenceData]) -> bool:
+        if snapshot is None:
+            return False
+        if self.ttl_seconds <= 0:
+            return True
+        return time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+
+    async def _reload(self, db: AsyncSession) -> ReferenceData:
+        self._version += 1
+        # A refill is amortized over every request until the TTL expires
+        with exempt_from_budget():
+            self._snapshot = await _load_snapshot(db, self._version)
+        logger.info(f"Loaded reference data version {self._version}.")
+        return self._snapshot
+
+    async def load(self, db: AsyncSession) -> ReferenceData:
+        async with self._lock:
+            return await self._reload(db)
+
+    async def get(self, db: AsyncSession) -> ReferenceData:
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            return snapshot
+
+        async with self._lock:
+            # Another request may have refreshed the snapshot while we were waiting.
+            if self._is_fresh(self._snapshot):
+                return self._snapshot
+            return await self._reload(db)
+
+    def invalidate(self) -> None:
+        """
+        Drop the snapshot so the next request reloads it. Affects this process only;
+        other workers pick up changes when their snapshot's TTL runs out.
+        """
+        self._snapshot = None
+        # Fragments are keyed by version, so the old ones would only be evicted by LRU
+        response_fragments.clear()
+
+
+reference_data = ReferenceDataCache(ttl_seconds=settings.REFERENCE_DATA_TTL_SECONDS)
+
+# Static parts of assessment responses, one per predicted class and reference data version
+response_fragments = TTLCache(maxsize=512, ttl_seconds=0)
+
+
+def cached_fragment(refs: ReferenceData, kind: str, key: Hashable, build: Callable[[], Any]) -> Any:
+    """
+    Return the response fragment for `key`, building it once per reference data version.
+
+    Fragments are shared between requests and must not be mutated.
+    """
+    cache_key = (kind, refs.version, key)
+    fragment = response_fragments.get(cache_key)
+    if fragment is None:
+        fragment = build()
+        response_fragments.set(cache_key, fragment)
+    return fragment
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.token_verifier import InvalidToken, token_verifier
+from app.services.token import create_refresh_token
+
+logger = logging.getLogger(__name__)
+
+
+def _token_hash(jti: str) -> bytes:
+    return hashlib.sha256(jti.encode()).digest()
+
+
+def _new_refresh_token(user_uuid: str, now: datetime) -> Tuple[str, bytes, datetime]:
+    jti = uuid.uuid4().hex
+    expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    return create_refresh_token({"sub": user_uuid}, jti, expires_at), _token_hash(jti), expires_at
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token.",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _verified_claims(refresh_token: Optional[str]) -> Optional[dict]:
+    # Only tokens with a valid signature and a jti reach the database
+    try:
+        claims = token_verifier.verify(refresh_token, "refresh")
+    except InvalidToken:
+        return None
+    return claims if claims.get("jti") and claims.get("sub") else None
+
+
+# The DELETE sees the table as it was before the INSERT, so keeping the newest
+# :keep unspent tokens leaves the user with :keep + 1 sessions including the new one.
+_ISSUE_SQL = """
+    WITH issued AS (
+        INSERT INTO refresh_tokens (token_hash, user_id, family_id, created_at, expires_at)
+        VALUES (:token_hash, :user_id, :family_id, :now, :expires_at)
+    )
+    DELETE FROM refresh_tokens
+    WHERE token_hash IN (
+        SELECT token_hash FROM refresh_tokens
+        WHERE user_id = :user_id AND rotated_at IS NULL
+        ORDER BY created_at DESC
+        OFFSET :keep
+    )
+"""
+
+
+async def issue_refresh_token(db: AsyncSession, user_id: int, user_uuid: str) -> str:
+    """
+    Start a new session (token family) for the user and return its refresh token.
+    """
+    now = datetime.utcnow()
+    refresh_token, token_hash, expires_at = _new_refresh_token(user_uuid, now)
+    await db.execute(
+        text(_ISSUE_SQL),
+        {
+            "token_hash": token_hash,
+            "user_id": user_id,
+            "family_id": str(uuid.uuid4()),
+            "now": now,
+            "expires_at": expires_at,
+            "keep": max(settings.REFRESH_TOKEN_MAX_SESSIONS - 1, 0),
+        },
+    )
+    await db.commit()
+    return refresh_token
+
+
+# Spends the presented token and issues its successor in the same family, in one
+# statement. A spent token is kept until the end of the reuse window (its expiry is
+# moved up), so the purge only has to look at expires_at.
+_ROTATE_SQL = """
+    WITH spent AS (
+        UPDATE refresh_tokens AS rt
+        SET rotated_at = :now, expires_at = LEAST(rt.expires_at, CAST(:spent_expires_at AS timestamp))
+        FROM users AS u
+        WHERE rt.token_hash = :token_hash
+          AND rt.rotated_at IS NULL
+          AND rt.expires_at > :now
+          AND u.id = rt.user_id
+          AND u.is_active IS TRUE
+          AND u.is_deleted IS NOT TRUE
+        RETURNING rt.user_id, rt.family_id, u.uuid
+    ),
+    issued AS (
+        INSERT INTO refresh_tokens (token_hash, user_id, family_id, created_at, expires_at)
+        SELECT CAST(:new_token_hash AS bytea), spent.user_id, spent.family_id,
+               CAST(:now AS timestamp), CAST(:expires_at AS timestamp)
+        FROM spent
+    )
+    SELECT uuid FROM spent
+"""
+
+_REVOKE_REUSED_FAMILY_SQL = """
+    DELETE FROM refresh_tokens
+    WHERE family_id = (
+        SELECT family_id FROM refresh_tokens WHERE token_hash = :token_hash AND rotated_at IS NOT NULL
+    )
+    RETURNING user_id
+"""
+
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> Tuple[str, str]:
+    """
+    Exchange a refresh token for its successor. Returns (user uuid, new refresh token).
+
+    Each refresh token works once. Presenting one that was already exchanged means it was
+    copied, so every token of its family is revoked and the user has to log in again.
+    """
+    claims = _verified_claims(refresh_token)
+    if claims is None:
+        raise _invalid_refresh_token()
+
+    now = datetime.utcnow()
+    token_hash = _token_hash(claims["jti"])
+    user_uuid = claims["sub"]
+    new_refresh_token, new_token_hash, expires_at = _new_refresh_token(user_uuid, now)
+    result = await db.execute(
+        text(_ROTATE_SQL),
+        {
+            "token_hash": token_hash,
+            "new_token_hash": new_token_hash,
+            "now": now,
+            "expires_at": expires_at,
+            "spent_expires_at": now + timedelta(hours=settings.REFRESH_TOKEN_REUSE_WINDOW_HOURS),
+        },
+    )
+    rotated_uuid = result.scalar_one_or_none()
+    if rotated_uuid == user_uuid:
+        await db.commit()
+        return rotated_uuid, new_refresh_token
+
+    await db.rollback()
+    revoked = (await db.execute(text(_REVOKE_REUSED_FAMILY_SQL), {"token_hash": token_hash})).all()
+    await db.commit()
+    if revoked:
+        logger.warning(
+            f"Refresh token reused for user {revoked[0].user_id}; revoked its {len(revoked)} session tokens."
+        )
+    raise _invalid_refresh_token()
+
+
+async def revoke_refresh_token(db: AsyncSession, refresh_token: Optional[str]) -> None:
+    """
+    End the session of a refresh token (logout). Invalid tokens are ignored.
+    """
+    claims = _verified_claims(refresh_token)
+    if claims is None:
+        return
+    await db.execute(
+        text(
+            "DELETE FROM refresh_tokens WHERE family_id = "
+            "(SELECT family_id FROM refresh_tokens WHERE token_hash = :token_hash)"
+        ),
+        {"token_hash": _token_hash(claims["jti"])},
+    )
+    await db.commit()
+
+
+async def revoke_user_refresh_tokens(db: AsyncSession, user_id: int) -> None:
+    """
+    End every session of the user, e.g. after a password change. Runs in the caller's
+    transaction, which the caller commits.
+    """
+    await db.execute(text("DELETE FROM refresh_tokens WHERE user_id = :user_id"), {"user_id": user_id})
+
+
+_PURGE_SQL = """
+    DELETE FROM refresh_tokens
+    WHERE token_hash IN (
+        SELECT token_hash FROM refresh_tokens
+        WHERE expires_at < :now
+        LIMIT :batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+
+async def purge_refresh_tokens(db: AsyncSession) -> int:
+    """
+    Delete expired and long-spent tokens in batches, committing after each so no batch
+    holds its locks for long. Returns the number of rows deleted.
+    """
+    purged = 0
+    batch_size = settings.REFRESH_TOKEN_PURGE_BATCH_SIZE
+    while True:
+        result = await db.execute(text(_PURGE_SQL), {"now": datetime.utcnow(), "batch_size": batch_size})
+        await db.commit()
+        purged += result.rowcount
+        if result.rowcount < batch_size:
+            return purged
+
+
+async def run_refresh_token_purge() -> None:
+    """
+    Purge the refresh token store every REFRESH_TOKEN_PURGE_INTERVAL_SECONDS, until cancelled.
+    """
+    while True:
+        try:
+            async for db in get_db():
+                purged = await purge_refresh_tokens(db)
+                if purged:
+                    logger.info(f"Purged {purged} expired refresh tokens.")
+                break
+        except Exception:
+            logger.exception("Refresh token purge failed.")
+        await asyncio.sleep(settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS)
@@ -1,35 +1,48 @@
-import pandas as pd
-import uuid
-from datetime import datetime
+from typing import Any, Dict, NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy.orm import joinedload
 from fastapi import HTTPException
-from app.models import (
-    SkillCategory,
-    DimensionCareer,
-    UserAssessmentScore,
-    UserResponse,
-    AssessmentType,
-    UserTest,
-)
-from app.models.dimension import Dimension
-from app.services.test import create_user_test
+from app.core.cache import prediction_cache, prediction_key
+from app.core.inference import inference_engine
+from app.models import UserTest
+from app.services.reference_data import reference_data
+from app.services.test import save_assessment_submission
 from app.schemas.skill_assessment import SkillAssessmentInput, SkillAssessmentResponse
+from ml_models.features import FeatureMismatch, FeatureVectorBuilder
 from ml_models.model_loader import load_skill_model
+from ml_models.registry import model_registry
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
-# Load skill assessment model and encoders
-skill_model, skill_encoders = load_skill_model()
+
+class SkillModels(NamedTuple):
+    skill_model: Any
+    skill_encoders: Dict[str, Any]
+    skill_features: FeatureVectorBuilder
+
+
+def _load_models(model_dir) -> SkillModels:
+    # Skill assessment model and encoders
+    skill_model, skill_encoders = load_skill_model(model_dir)
+    return SkillModels(skill_model, skill_encoders, FeatureVectorBuilder.for_model(skill_model))
+
+
+def _predict_skill_levels(rows, version):
+    models = model_registry.get("skill", version)
+    return models.skill_model.predict(models.skill_features.frame(rows))
+
+
+model_registry.register("skill", _load_models)
+
+
+inference_engine.register("skill_levels", _predict_skill_levels)
 
 
 async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
-    stmt = select(AssessmentType.id).where(AssessmentType.name == name)
-    result = await db.execute(stmt)
-    assessment_type_id = result.scalars().first()
+    refs = await reference_data.get(db)
+    assessment_type_id = refs.get_assessment_type_id(name)
 
     if not assessment_type_id:
         raise HTTPException(
@@ -60,38 +73,48 @@ async def predict_skills(
 
         # Fetch the dynamic assessment type ID for "Skill"
         assessment_type_id = await get_assessment_type_id("Skills", db)
+        refs = await reference_data.get(db)
 
-        # Check if `test_uuid` is provided, otherwise create a new test
+        # Check if `test_uuid` is provided, otherwise a new test is created when the results are saved
+        user_test_id = None
         if data.test_uuid:
             # Validate the provided test_uuid
-            test_query = select(UserTest).where(UserTest.uuid == data.test_uuid, UserTest.user_id == user_id)
+            test_query = select(UserTest.id).where(UserTest.uuid == data.test_uuid, UserTest.user_id == user_id)
             test_result = await db.execute(test_query)
-            user_test = test_result.scalars().first()
-            if not user_test:
+            user_test_id = test_result.scalar()
+            if not user_test_id:
                 raise HTTPException(status_code=404, detail="Invalid test UUID provided.")
-        else:
-            user_test = await create_user_test(db, user_id, "Skills")
-
-        # Process the input data
-        input_df = pd.DataFrame([data.responses])
-        logger.debug(f"Input DataFrame: {input_df}")
 
         # Predict skill levels
-        predictions = skill_model.predict(input_df)
-        logger.debug(f"Model Predictions: {predictions}")
-
-        # Decode predictions
-        target_columns = list(skill_encoders.keys())
-        predicted_labels = {
-            column: skill_encoders[column].inverse_transform([predictions[0][idx]])[0]
-            for idx, column in enumerate(target_columns)
-        }
+        # Pin the model version until the predictions are done, even if it is swapped meanwhile
+        with model_registry.pinned() as model_version:
+            models = await model_registry.get_async("skill", model_version)
+            try:
+                skill_input = models.skill_features.build(data.responses, strict=True)
+            except FeatureMismatch as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+            # Identical answer sets always decode to the same levels for a model version
+            cache_key = prediction_key("skill", model_version, skill_input)
+            predicted_labels = prediction_cache.get(cache_key)
+            if predicted_labels is None:
+                prediction = await inference_engine.predict("skill_levels", skill_input, model_version)
+                logger.debug(f"Model Predictions: {prediction}")
+
+                # Decode predictions
+                target_columns = list(models.skill_encoders.keys())
+                predicted_labels = {
+                    column: models.skill_encoders[column].inverse_transform([prediction[idx]])[0]
+                    for idx, column in enumerate(target_columns)
+                }
+                prediction_cache.set(cache_key, predicted_labels)
         logger.debug(f"Predicted Labels: {predicted_labels}")
 
         category_percentages = {}
         skills_by_levels = {"Strong": [], "Average": [], "Weak": []}
         suggested_careers = []
         total_skills_per_category = {}
+        assessment_scores = []
 
         for skill, level in predicted_labels.items():
             # Add " Level" only if the skill name does not already include "Level"
@@ -101,30 +124,20 @@ async def predict_skills(
                 skill_with_level = skill
             logger.debug(f"Querying for skill: {skill_with_level}")
 
-            # Fetch the corresponding Dimension
-            dimension_query = select(Dimension).where(Dimension.name == skill_with_level)
-            result = await db.execute(dimension_query)
-            dimension = result.scalars().first()
+            # Look up the corresponding Dimension
+            dimension = refs.dimensions.get(skill_with_level)
 
             if not dimension:
                 logger.warning(f"No dimension found for skill: {skill_with_level}")
                 continue
 
-            # Fetch the skill category
-            skill_category_query = (
-                select(SkillCategory)
-                .options(joinedload(SkillCategory.dimension))
-                .where(SkillCategory.dimension_id == dimension.id)
-            )
-            result = await db.execute(skill_category_query)
-            skill_category = result.scalars().first()
+            # Look up the skill category
+            category_name = refs.skill_categories_by_dimension_id.get(dimension.id)
 
-            if not skill_category:
+            if not category_name:
                 logger.warning(f"No skill category found for dimension ID: {dimension.id}")
                 continue
 
-            category_name = skill_category.category_name
-
             # Categorize skill level
             if level in ["Strong", "High"]:
                 category_level = "Strong"
@@ -140,22 +153,13 @@ async def predict_skills(
             })
 
             if category_level == "Strong":
-                # Fetch related careers for strong skills
-                careers_query = (
-                    select(DimensionCareer)
-                    .options(joinedload(DimensionCareer.career))
-                    .where(DimensionCareer.dimension_id == dimension.id)
-                )
-                result = await db.execute(careers_query)
-                careers = result.scalars().all()
+                # Related careers for strong skills
+                careers = refs.careers_by_dimension_id.get(dimension.id, ())
 
                 if not careers:
                     logger.warning(f"No careers found for dimension ID: {dimension.id}")
                 else:
-                    suggested_careers.extend(
-                        {"career_name": career.career.name}
-                        for career in careers if career.career
-                    )
+                    suggested_careers.extend({"career_name": career} for career in careers)
 
             # Update category percentage calculations
             if category_name not in category_percentages:
@@ -172,19 +176,13 @@ async def predict_skills(
             )
 
             # Save the assessment score with only level and percentage
-            assessment_score = UserAssessmentScore(
-                uuid=str(uuid.uuid4()),
-                user_id=user_id,
-                user_test_id=user_test.id,
-                assessment_type_id=assessment_type_id,
-                dimension_id=dimension.id,
-                score={
+            assessment_scores.append({
+                "dimension_id": dimension.id,
+                "score": {
                     "level": level,
                     "percentage": category_percentage
                 },
-                created_at=datetime.utcnow(),
-            )
-            db.add(assessment_score)
+            })
 
         # Calculate category percentages
         for category in category_percentages.keys():
@@ -201,19 +199,20 @@ async def predict_skills(
             strong_careers=suggested_careers,
         )
 
-        user_response = UserResponse(
-            uuid=str(uuid.uuid4()),
+        # Save the test (unless it already exists), scores and user response in one transaction
+        await save_assessment_submission(
+            db,
             user_id=user_id,
-            user_test_id=user_test.id,
             assessment_type_id=assessment_type_id,
+            test_name_prefix="Skills",
+            scores=assessment_scores,
             response_data=json.dumps(response.dict()),
-            created_at=datetime.utcnow(),
+            user_test_id=user_test_id,
         )
-        db.add(user_response)
-
-        await db.commit()
         return response
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.exception("Error during skill prediction")
         await db.rollback()
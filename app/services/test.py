@@ -1,5 +1,8 @@
 import json
 import uuid
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import Boolean, String, and_, bindparam, func
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import text
 from datetime import date
 from sqlalchemy.orm import joinedload
@@ -11,6 +14,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 
 from app.schemas.payload import BaseResponse
+from app.utils.pagination import decode_cursor, keyset_paginate, page_from_rows
 
 
 async def get_shared_test(test_uuid: str, db: AsyncSession) -> BaseResponse:
@@ -109,93 +113,137 @@ async def delete_test(test_uuid: str, user_id: int, db: AsyncSession):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
-async def get_tests_by_user(user_id: int, db: AsyncSession):
+# The first page reports how many tests match, counting at most this many
+TEST_HISTORY_COUNT_CAP = 1000
+
+
+async def get_tests_by_user(
+    user_id: int,
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    assessment_type_uuid: Optional[str] = None,
+    is_completed: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """
+    One page of the user's tests, newest first, optionally limited to tests with a
+    response of an assessment type and/or by completion.
+
+    Pages are keyed on (created_at, id), so each costs one index seek whatever the
+    history length. The total is only computed for the first page, by counting at most
+    TEST_HISTORY_COUNT_CAP matching tests; `total_is_estimate` is set when the cap was hit.
+    """
     try:
-        stmt = select(UserTest).where(
-            UserTest.user_id == user_id,
-            UserTest.is_deleted == False
-        ).order_by(UserTest.created_at.desc())
+        filters = [UserTest.user_id == user_id, UserTest.is_deleted == False]
+        if is_completed is not None:
+            filters.append(UserTest.is_completed == is_completed)
+        if assessment_type_uuid:
+            filters.append(
+                UserTest.user_responses.any(
+                    and_(
+                        UserResponse.is_deleted == False,
+                        UserResponse.assessment_type.has(AssessmentType.uuid == assessment_type_uuid),
+                    )
+                )
+            )
 
+        after = decode_cursor(cursor, (datetime, int)) if cursor else None
+        stmt = keyset_paginate(select(UserTest).where(*filters), UserTest.created_at, UserTest.id, after, limit)
         result = await db.execute(stmt)
-        tests = result.scalars().all()
-
-        if not tests:
-            raise HTTPException(status_code=404, detail="No tests found for this user.")
+        tests, next_cursor = page_from_rows(result.scalars().all(), limit, lambda test: (test.created_at, test.id))
+
+        total = None
+        total_is_estimate = False
+        if cursor is None:
+            if not tests and assessment_type_uuid is None and is_completed is None:
+                raise HTTPException(status_code=404, detail="No tests found for this user.")
+            capped = select(UserTest.id).where(*filters).limit(TEST_HISTORY_COUNT_CAP + 1).subquery()
+            total = (await db.execute(select(func.count()).select_from(capped))).scalar_one()
+            if total > TEST_HISTORY_COUNT_CAP:
+                total, total_is_estimate = TEST_HISTORY_COUNT_CAP, True
 
-        return [
-            {
-                "test_uuid": test.uuid,
-                "test_name": test.name,
-                "is_completed": test.is_completed,
-                "is_deleted": test.is_deleted,
-                "created_at": test.created_at,
-            }
-            for test in tests
-        ]
+        return {
+            "tests": [
+                {
+                    "test_uuid": test.uuid,
+                    "test_name": test.name,
+                    "is_completed": test.is_completed,
+                    "is_deleted": test.is_deleted,
+                    "created_at": test.created_at,
+                }
+                for test in tests
+            ],
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+        }
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+# One row per active assessment type with the test's draft and completion state. The
+# test is the driving row, so an unknown test yields no rows and a test without any
+# assessment types a single row whose type columns are NULL.
+_TEST_DETAILS_SQL = text(
+    """
+    SELECT t.uuid AS test_uuid,
+           t.name AS test_name,
+           at.uuid AS assessment_type_uuid,
+           at.name AS assessment_type_name,
+           coalesce(bool_or(ur.is_draft), false) AS has_draft,
+           coalesce(bool_or(NOT ur.is_draft), false) AS has_response,
+           (array_agg(ur.response_data ORDER BY ur.id) FILTER (WHERE ur.is_draft))[1] AS draft_data
+    FROM user_tests t
+    LEFT JOIN assessment_types at ON at.is_deleted = false
+    LEFT JOIN user_responses ur
+           ON ur.user_test_id = t.id AND ur.assessment_type_id = at.id AND ur.is_deleted = false
+    WHERE t.uuid = :test_uuid AND t.user_id = :user_id AND t.is_deleted = false
+    GROUP BY t.id, at.id
+    ORDER BY at.id
+    """
+).columns(
+    test_uuid=String,
+    test_name=String,
+    assessment_type_uuid=String,
+    assessment_type_name=String,
+    has_draft=Boolean,
+    has_response=Boolean,
+    draft_data=JSONB,
+)
+
+
 async def get_test_details(test_uuid: str, user_id: int, db: AsyncSession):
     try:
-        # Validate test_uuid and fetch UserTest
-        stmt = select(UserTest).where(
-            UserTest.uuid == test_uuid,
-            UserTest.user_id == user_id,
-            UserTest.is_deleted == False
-        )
-        result = await db.execute(stmt)
-        user_test = result.scalars().first()
+        # Completion status of every assessment type in a single round-trip
+        result = await db.execute(_TEST_DETAILS_SQL, {"test_uuid": test_uuid, "user_id": user_id})
+        rows = result.all()
 
-        if not user_test:
+        if not rows:
             raise HTTPException(status_code=404, detail="Test not found.")
 
-        # Fetch all assessment types
-        assessment_types_stmt = select(AssessmentType).where(
-            AssessmentType.is_deleted == False
-        )
-        assessment_types_result = await db.execute(assessment_types_stmt)
-        assessment_types = assessment_types_result.scalars().all()
-
-        if not assessment_types:
+        if rows[0].assessment_type_uuid is None:
             raise HTTPException(status_code=404, detail="No assessment types found.")
 
         assessments_data = []
 
-        for assessment_type in assessment_types:
-            # Check if a draft exists for this assessment type
-            draft_stmt = select(UserResponse).where(
-                UserResponse.user_test_id == user_test.id,
-                UserResponse.assessment_type_id == assessment_type.id,
-                UserResponse.is_draft == True,
-                UserResponse.is_deleted == False
-            )
-            draft_result = await db.execute(draft_stmt)
-            draft = draft_result.scalars().first()
-
+        for row in rows:
             # Determine completion status
-            if draft:
+            if row.has_draft:
                 completion_status = "in_progress"
             else:
-                response_stmt = select(UserResponse).where(
-                    UserResponse.user_test_id == user_test.id,
-                    UserResponse.assessment_type_id == assessment_type.id,
-                    UserResponse.is_draft == False,
-                    UserResponse.is_deleted == False
-                )
-                response_result = await db.execute(response_stmt)
-                response = response_result.scalars().first()
-                completion_status = "completed" if response else "not_started"
+                completion_status = "completed" if row.has_response else "not_started"
 
             # Parse draft response data if available
             draft_data = None
-            if draft and draft.response_data:
+            if row.has_draft and row.draft_data:
                 try:
-                    if isinstance(draft.response_data, str):
-                        draft_data = json.loads(draft.response_data)
+                    if isinstance(row.draft_data, str):
+                        draft_data = json.loads(row.draft_data)
                     else:
-                        draft_data = draft.response_data
+                        draft_data = row.draft_data
 
                     if isinstance(draft_data, dict) and not draft_data.get("responses"):
                         draft_data = {"responses": draft_data}
@@ -204,16 +252,16 @@ async def get_test_details(test_uuid: str, user_id: int, db: AsyncSession):
                     draft_data = {"responses": {}}
 
             assessments_data.append({
-                "assessment_type_uuid": assessment_type.uuid,
-                "assessment_type_name": assessment_type.name,
-                "is_draft": bool(draft),
+                "assessment_type_uuid": row.assessment_type_uuid,
+                "assessment_type_name": row.assessment_type_name,
+                "is_draft": row.has_draft,
                 "draft_data": draft_data,
                 "completion_status": completion_status
             })
 
         return {
-            "test_uuid": user_test.uuid,
-            "test_name": user_test.name,
+            "test_uuid": rows[0].test_uuid,
+            "test_name": rows[0].test_name,
             "assessments": assessments_data
         }
 
@@ -223,54 +271,139 @@ async def get_test_details(test_uuid: str, user_id: int, db: AsyncSession):
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 
+class SavedTest(NamedTuple):
+    id: int
+    uuid: str
+    name: str
+
+
+# Bumps the user's counter for the prefix (creating it at 1) and inserts the test named
+# after it in the same statement. The counter row lock serializes concurrent submissions
+# of the same user and prefix, so every test gets its own number.
+_NEW_TEST_CTE = """
+    counter AS (
+        INSERT INTO user_test_counters (user_id, prefix, last_index)
+        VALUES (:user_id, :test_name_prefix, 1)
+        ON CONFLICT (user_id, prefix)
+        DO UPDATE SET last_index = user_test_counters.last_index + 1
+        RETURNING last_index
+    ),
+    new_test AS (
+        INSERT INTO user_tests (uuid, user_id, name, is_completed, is_deleted, created_at, updated_at)
+        SELECT CAST(:test_uuid AS varchar), CAST(:user_id AS integer),
+               CAST(:test_name_prefix AS varchar) || ' Test ' || counter.last_index,
+               false, false, CAST(:now AS timestamp), CAST(:now AS timestamp)
+        FROM counter
+        RETURNING *
+    )
+"""
+
 
 async def create_user_test(db: AsyncSession, user_id: int, test_name_prefix: str) -> UserTest:
     try:
-        # Query the latest test name to determine the next index
-        stmt = text(
-            """
-            SELECT name
-            FROM user_tests
-            WHERE user_id = :user_id
-            ORDER BY created_at DESC
-            LIMIT 1
-            """
-        )
-        result = await db.execute(stmt, {"user_id": user_id})
-        latest_test = result.scalar()
-
-        # Determine the next test index
-        if latest_test and latest_test.startswith(test_name_prefix):
-            try:
-                latest_index = int(latest_test.split(" ")[-1])
-                next_index = latest_index + 1
-            except ValueError:
-                next_index = 1
-        else:
-            next_index = 1
-
-        test_name = f"{test_name_prefix} Test {next_index}"
-
-        # Create and save the new test
-        new_test = UserTest(
-            uuid=str(uuid.uuid4()),
-            user_id=user_id,
-            name=test_name,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow(),
-            is_completed=False,
-            is_deleted=False,
+        stmt = select(UserTest).from_statement(text(f"WITH {_NEW_TEST_CTE} SELECT * FROM new_test"))
+        result = await db.execute(
+            stmt,
+            {
+                "user_id": user_id,
+                "test_name_prefix": test_name_prefix,
+                "test_uuid": str(uuid.uuid4()),
+                "now": datetime.utcnow(),
+            },
         )
-        db.add(new_test)
+        new_test = result.scalar_one()
         await db.commit()
-        await db.refresh(new_test)
 
         return new_test
 
     except Exception as e:
+        await db.rollback()
         raise RuntimeError(f"Failed to create user test: {e}")
 
 
+_EXISTING_TEST_CTE = """
+    new_test AS (
+        SELECT id, uuid, name FROM user_tests WHERE id = :user_test_id
+    )
+"""
+
+_SAVE_SUBMISSION_SQL = """
+    WITH {test_cte},
+    params AS (
+        SELECT CAST(:user_id AS integer) AS user_id,
+               CAST(:assessment_type_id AS integer) AS assessment_type_id,
+               CAST(:now AS timestamp) AS now
+    ),
+    new_scores AS (
+        INSERT INTO user_assessment_scores
+            (uuid, user_id, assessment_type_id, dimension_id, user_test_id, score, is_deleted, created_at)
+        SELECT s.uuid, params.user_id, params.assessment_type_id, s.dimension_id, new_test.id, s.score, false, params.now
+        FROM new_test, params, jsonb_to_recordset(:scores) AS s(uuid text, dimension_id integer, score jsonb)
+        RETURNING id
+    ),
+    new_response AS (
+        INSERT INTO user_responses
+            (uuid, user_id, assessment_type_id, user_test_id, response_data, is_draft, is_deleted, created_at)
+        SELECT CAST(:response_uuid AS varchar), params.user_id, params.assessment_type_id, new_test.id,
+               :response_data, false, false, params.now
+        FROM new_test, params
+        RETURNING id
+    )
+    SELECT new_test.id, new_test.uuid, new_test.name FROM new_test
+"""
+
+
+async def save_assessment_submission(
+    db: AsyncSession,
+    user_id: int,
+    assessment_type_id: int,
+    test_name_prefix: str,
+    scores: List[Dict[str, Any]],
+    response_data: Any,
+    user_test_id: Optional[int] = None,
+) -> SavedTest:
+    """
+    Write a completed assessment in one transaction: the test, its scores and the response.
+
+    `scores` holds one {"dimension_id": ..., "score": {...}} item per dimension. The test
+    row, every score row and the response row are inserted by a single statement, and
+    the transaction is committed once, so a failure never leaves an orphan test.
+    Pass `user_test_id` to attach the results to an existing test instead of a new one.
+    """
+    test_cte = _NEW_TEST_CTE if user_test_id is None else _EXISTING_TEST_CTE
+    stmt = text(_SAVE_SUBMISSION_SQL.format(test_cte=test_cte)).bindparams(
+        bindparam("scores", type_=JSONB),
+        bindparam("response_data", type_=JSONB),
+    )
+    params = {
+        "user_id": user_id,
+        "assessment_type_id": assessment_type_id,
+        "now": datetime.utcnow(),
+        "scores": [
+            {"uuid": str(uuid.uuid4()), "dimension_id": row["dimension_id"], "score": row["score"]}
+            for row in scores
+        ],
+        "response_uuid": str(uuid.uuid4()),
+        "response_data": response_data,
+    }
+    if user_test_id is None:
+        params.update({"test_uuid": str(uuid.uuid4()), "test_name_prefix": test_name_prefix})
+    else:
+        params["user_test_id"] = user_test_id
+
+    try:
+        result = await db.execute(stmt, params)
+        saved = result.one_or_none()
+        if saved is None:
+            raise RuntimeError(f"User test {user_test_id} does not exist.")
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    return SavedTest(id=saved.id, uuid=saved.uuid, name=saved.name)
+
+
 async def get_assessment_responses_by_test(
     test_uuid: str,
     db: AsyncSession,
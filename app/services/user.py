@@ -1,10 +1,14 @@
 from fastapi import HTTPException, status, UploadFile
+from sqlalchemy import and_, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from datetime import datetime
+from typing import Optional
 import shutil
+from ..core.cache import principal_cache
 from ..models.user import User
-from ..schemas.user import UserResponseDto, UpdateUserDto
+from ..schemas.user import UserListResponseDto, UserResponseDto, UpdateUserDto
+from ..utils.pagination import decode_cursor, keyset_paginate, page_from_rows
 from ..utils.verify import is_valid_uuid
 
 
@@ -95,6 +99,7 @@ async def delete_user_by_uuid(uuid: str, session: AsyncSession):
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    principal_cache.delete(user.uuid)
 
     return {"message": f"User with UUID {uuid} has been marked as deleted."}
 
@@ -121,6 +126,7 @@ async def update_user_by_uuid(uuid: str, user_update: UpdateUserDto, session: As
     session.add(user)
     await session.commit()
     await session.refresh(user)
+    principal_cache.delete(user.uuid)
 
     return {
         "message": "User updated successfully.",
@@ -142,29 +148,89 @@ async def update_user_by_uuid(uuid: str, user_update: UpdateUserDto, session: As
     }
 
 
-async def get_all_users(session: AsyncSession):
-    query = select(User).where(User.is_deleted == False).order_by(User.created_at.desc())
+# Only the columns the listing displays (plus the paging key) are fetched
+USER_LIST_COLUMNS = (
+    User.id,
+    User.created_at,
+    User.uuid,
+    User.username,
+    User.email,
+    User.avatar,
+    User.address,
+    User.phone_number,
+    User.bio,
+    User.gender,
+    User.date_of_birth,
+    User.is_deleted,
+    User.is_active,
+    User.is_verified,
+    User.registered_at,
+)
+
+
+def _prefix_range(column, prefix: str):
+    # Prefix match as a range on the "C" collation, which the lower(...) COLLATE "C"
+    # indexes serve even when the prefix arrives as a bind parameter.
+    value = func.lower(column).collate("C")
+    prefix = prefix.lower()
+    upper = ord(prefix[-1]) + 1
+    if upper == 0xD800:
+        # Surrogates cannot be encoded, and no character sorts between U+D7FF and U+E000
+        upper = 0xE000
+    if upper > 0x10FFFF:
+        return value >= prefix
+    return and_(value >= prefix, value < prefix[:-1] + chr(upper))
+
+
+async def get_all_users(
+    session: AsyncSession,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    is_verified: Optional[bool] = None,
+    is_active: Optional[bool] = None,
+    registered_from: Optional[datetime] = None,
+    registered_to: Optional[datetime] = None,
+    search: Optional[str] = None,
+):
+    filters = [User.is_deleted == False]
+    if is_verified is not None:
+        filters.append(User.is_verified == is_verified)
+    if is_active is not None:
+        filters.append(User.is_active == is_active)
+    if registered_from is not None:
+        filters.append(User.registered_at >= registered_from)
+    if registered_to is not None:
+        filters.append(User.registered_at < registered_to)
+    if search and search.strip():
+        term = search.strip()
+        filters.append(or_(_prefix_range(User.username, term), _prefix_range(User.email, term)))
+
+    after = decode_cursor(cursor, (datetime, int)) if cursor else None
+    query = keyset_paginate(select(*USER_LIST_COLUMNS).where(*filters), User.created_at, User.id, after, limit)
     result = await session.execute(query)
-    users = result.scalars().all()
-
-    return [
-        UserResponseDto(
-            uuid=user.uuid,
-            username=user.username,
-            email=user.email,
-            avatar=user.avatar,
-            address=user.address,
-            phone_number=user.phone_number,
-            bio=user.bio,
-            gender=user.gender,
-            date_of_birth=user.date_of_birth,
-            is_deleted=user.is_deleted,
-            is_active=user.is_active,
-            is_verified=user.is_verified,
-            registered_at=user.registered_at
-        )
-        for user in users
-    ]
+    users, next_cursor = page_from_rows(result.all(), limit, lambda user: (user.created_at, user.id))
+
+    return UserListResponseDto(
+        users=[
+            UserResponseDto(
+                uuid=user.uuid,
+                username=user.username,
+                email=user.email,
+                avatar=user.avatar,
+                address=user.address,
+                phone_number=user.phone_number,
+                bio=user.bio,
+                gender=user.gender,
+                date_of_birth=user.date_of_birth,
+                is_deleted=user.is_deleted,
+                is_active=user.is_active,
+                is_verified=user.is_verified,
+                registered_at=user.registered_at
+            )
+            for user in users
+        ],
+        next_cursor=next_cursor,
+    )
 
 
 async def get_user_by_uuid(uuid: str, session: AsyncSession):
@@ -1,33 +1,58 @@
-import pandas as pd
-import uuid
-from datetime import datetime
+import numpy as np
+from typing import Any, List, NamedTuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
 from fastapi import HTTPException
-from app.models.value_category import ValueCategory
-from app.models.career import Career
-from app.models.user_response import UserResponse
-from app.models.user_assessment_score import UserAssessmentScore
-from app.models.assessment_type import AssessmentType
-from app.models.dimension import Dimension
+from app.core.cache import prediction_cache, prediction_key
+from app.core.inference import inference_engine
 from app.schemas.value_assessment import (
     ValueAssessmentResponse,
     ChartData,
     ValueCategoryDetails,
 )
-from app.services.test import create_user_test
+from app.services.reference_data import reference_data
+from app.services.test import save_assessment_submission
+from ml_models.features import FeatureMismatch, FeatureVectorBuilder
+from ml_models.flat_forest import FlatForest
 from ml_models.model_loader import load_feature_score_models, load_target_value_model
+from ml_models.registry import model_registry
 import logging
 import json
 
 logger = logging.getLogger(__name__)
 
-try:
-    feature_score_models = load_feature_score_models()
-    target_value_model = load_target_value_model()
-except RuntimeError as e:
-    logger.error(f"Error loading models: {e}")
-    raise
+
+class ValueModels(NamedTuple):
+    feature_score_forest: FlatForest
+    target_value_model: Any
+    response_features: FeatureVectorBuilder
+    feature_names: List[str]
+
+
+def _load_models(model_dir) -> ValueModels:
+    try:
+        feature_score_forest = load_feature_score_models(model_dir)
+        target_value_model = load_target_value_model(model_dir)
+    except RuntimeError as e:
+        logger.error(f"Error loading models: {e}")
+        raise
+
+    return ValueModels(
+        feature_score_forest=feature_score_forest,
+        target_value_model=target_value_model,
+        response_features=FeatureVectorBuilder(feature_score_forest.feature_names),
+        feature_names=list(feature_score_forest.output_names),
+    )
+
+
+def _predict_feature_scores(rows, version):
+    models = model_registry.get("value", version)
+    return models.feature_score_forest.predict(models.response_features.stack(rows))
+
+
+model_registry.register("value", _load_models)
+
+
+inference_engine.register("value_feature_scores", _predict_feature_scores)
 
 expected_features = [
     "Work-Life Balance Score",
@@ -44,20 +69,19 @@ expected_features = [
 ]
 
 
-def normalize_scores(scores_df, target_min=1, target_max=10):
-    min_score, max_score = scores_df.min().min(), scores_df.max().max()
+def normalize_scores(scores, target_min=1, target_max=10):
+    min_score, max_score = scores.min(), scores.max()
     logger.debug(f"Normalizing scores with min: {min_score}, max: {max_score}")
 
     if max_score == min_score:
-        return scores_df.applymap(lambda _: (target_min + target_max) / 2)
+        return np.full(scores.shape, (target_min + target_max) / 2)
 
-    return scores_df.applymap(lambda x: target_min + (x - min_score) * (target_max - target_min) / (max_score - min_score))
+    return target_min + (scores - min_score) * (target_max - target_min) / (max_score - min_score)
 
 
 async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
-    stmt = select(AssessmentType.id).where(AssessmentType.name == name)
-    result = await db.execute(stmt)
-    assessment_type_id = result.scalars().first()
+    refs = await reference_data.get(db)
+    assessment_type_id = refs.get_assessment_type_id(name)
     if not assessment_type_id:
         raise HTTPException(status_code=404, detail=f"Assessment type '{name}' not found.")
     return assessment_type_id
@@ -65,26 +89,35 @@ async def get_assessment_type_id(name: str, db: AsyncSession) -> int:
 
 async def process_value_assessment(responses, db: AsyncSession, current_user) -> ValueAssessmentResponse:
     try:
-        user_test = await create_user_test(db, current_user.id, "Value Assessment")
-
         assessment_type_id = await get_assessment_type_id("Values", db)
-
-        input_data = pd.DataFrame([responses])
-        logger.debug(f"User responses converted to DataFrame: {input_data}")
-
-        feature_scores = {}
-        for feature, model in feature_score_models.items():
-            feature_scores[feature] = model.predict(input_data)[0]
-        feature_scores_df = pd.DataFrame([feature_scores])
-        logger.debug(f"Predicted feature scores: {feature_scores_df}")
-
-        normalized_feature_scores = normalize_scores(feature_scores_df)
+        refs = await reference_data.get(db)
+        # Pin the model version until the predictions are done, even if it is swapped meanwhile
+        with model_registry.pinned() as model_version:
+            models = await model_registry.get_async("value", model_version)
+            feature_names = models.feature_names
+
+            try:
+                value_input = models.response_features.build(responses, strict=True)
+            except FeatureMismatch as e:
+                raise HTTPException(status_code=422, detail=str(e))
+
+            # Identical answer sets always produce the same scores for a model version
+            cache_key = prediction_key("value", model_version, value_input)
+            feature_predictions = prediction_cache.get(cache_key)
+            if feature_predictions is None:
+                feature_predictions = await inference_engine.predict("value_feature_scores", value_input, model_version)
+                prediction_cache.set(cache_key, feature_predictions)
+        logger.debug(f"Predicted feature scores: {dict(zip(feature_names, feature_predictions))}")
+
+        normalized_scores = normalize_scores(feature_predictions)
+        normalized_feature_scores = dict(zip(feature_names, normalized_scores))
         logger.debug(f"Normalized feature scores: {normalized_feature_scores}")
 
-        total_score = normalized_feature_scores.iloc[0].sum()
+        total_score = normalized_scores.sum()
         logger.debug(f"Total normalized score: {total_score}")
 
-        top_3_features = normalized_feature_scores.iloc[0].nlargest(3).index.tolist()
+        # Stable sort keeps the first feature on ties, like Series.nlargest
+        top_3_features = sorted(feature_names, key=normalized_feature_scores.get, reverse=True)[:3]
         logger.debug(f"Top 3 features extracted: {top_3_features}")
 
         chart_data = []
@@ -92,7 +125,7 @@ async def process_value_assessment(responses, db: AsyncSession, current_user) ->
         career_recommendations = []
         assessment_scores = []
 
-        for category, score in normalized_feature_scores.iloc[0].items():
+        for category, score in normalized_feature_scores.items():
             chart_data.append(
                 ChartData(
                     label=category.replace(" Score", ""),
@@ -105,12 +138,7 @@ async def process_value_assessment(responses, db: AsyncSession, current_user) ->
 
             logger.debug(f"Processing feature: {feature_name}")
 
-            category_query = select(ValueCategory).where(
-                ValueCategory.name == feature_name,
-                ValueCategory.is_deleted == False
-            )
-            result = await db.execute(category_query)
-            value_category = result.scalars().first()
+            value_category = refs.value_categories.get(feature_name)
 
             if not value_category:
                 logger.warning(f"No ValueCategory found for feature: {feature_name}")
@@ -118,17 +146,13 @@ async def process_value_assessment(responses, db: AsyncSession, current_user) ->
 
             logger.debug(f"ValueCategory found: {value_category.name}")
 
-            dimension_query = select(Dimension.id).where(
-                Dimension.name == f"{feature_name} Score"
-            )
-            dimension_result = await db.execute(dimension_query)
-            dimension_id = dimension_result.scalars().first()
+            dimension = refs.dimensions.get(f"{feature_name} Score")
 
-            if not dimension_id:
+            if not dimension:
                 logger.error(f"Dimension not found for feature: {feature_name} Score. Skipping.")
                 continue
 
-            score = normalized_feature_scores.iloc[0][feature]
+            score = normalized_feature_scores[feature]
             percentage = (score / total_score) * 100
 
             value_details.append(
@@ -142,36 +166,23 @@ async def process_value_assessment(responses, db: AsyncSession, current_user) ->
 
             logger.debug(f"Added to value_details: {value_category.name}")
 
-            assessment_scores.append(
-                UserAssessmentScore(
-                    uuid=str(uuid.uuid4()),
-                    user_id=current_user.id,
-                    user_test_id=user_test.id,
-                    assessment_type_id=assessment_type_id,
-                    dimension_id=dimension_id,  # Use the dynamically retrieved dimension ID
-                    score={
-                        "score": round(score, 2),
-                        "percentage": round(percentage, 2),
-                    },
-                    created_at=datetime.utcnow(),
-                )
-            )
+            assessment_scores.append({
+                "dimension_id": dimension.id,
+                "score": {
+                    "score": round(score, 2),
+                    "percentage": round(percentage, 2),
+                },
+            })
 
-            careers_query = select(Career).where(
-                Career.value_category_id == value_category.id
-            )
-            careers_result = await db.execute(careers_query)
-            careers = careers_result.scalars().all()
+            careers = refs.careers_by_value_category_id.get(value_category.id, ())
 
             if not careers:
                 logger.warning(f"No careers found for ValueCategory ID: {value_category.id}")
 
-            career_recommendations.extend([career.name for career in careers])
+            career_recommendations.extend(careers)
 
         career_recommendations = list(set(career_recommendations))
 
-        db.add_all(assessment_scores)
-
         response = ValueAssessmentResponse(
             user_id=current_user.uuid,
             chart_data=chart_data,
@@ -181,20 +192,20 @@ async def process_value_assessment(responses, db: AsyncSession, current_user) ->
 
         logger.debug(f"Final response prepared: {response}")
 
-        user_response = UserResponse(
-            uuid=str(uuid.uuid4()),
+        # Save the test, scores and user response in one transaction
+        await save_assessment_submission(
+            db,
             user_id=current_user.id,
-            user_test_id=user_test.id,
             assessment_type_id=assessment_type_id,
+            test_name_prefix="Value Assessment",
+            scores=assessment_scores,
             response_data=json.dumps(response.dict()),
-            created_at=datetime.utcnow(),
         )
-        db.add(user_response)
-
-        await db.commit()
 
         return response
 
+    except HTTPException as e:
+        raise e
     except Exception as e:
         logger.exception("Error processing value assessment.")
         await db.rollback()
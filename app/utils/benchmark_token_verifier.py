@@ -0,0 +1,58 @@
+"""
+Measure the per-request cost of verifying the bearer token.
+
+    python -m app.utils.benchmark_token_verifier [--iterations 20000]
+
+Times a full signature check with each JWT backend, a repeat request served from the
+claims cache and the rejection of a malformed token, with the configured secret and
+algorithm. Use it to choose JWT_BACKEND and to check the cache is worth its memory.
+"""
+import argparse
+import logging
+import timeit
+from datetime import timedelta
+
+from app.core.cache import TTLCache
+from app.core.token_verifier import JWT_BACKENDS, InvalidToken, TokenVerifier
+from app.services.token import create_access_token
+
+logger = logging.getLogger(__name__)
+
+
+def _per_call_us(operation, iterations: int) -> float:
+    return timeit.timeit(operation, number=iterations) / iterations * 1e6
+
+
+def benchmark(iterations: int) -> dict:
+    token = create_access_token({"sub": "00000000-0000-0000-0000-000000000000"}, timedelta(minutes=5))
+    results = {}
+
+    for backend, decode in JWT_BACKENDS.items():
+        results[f"{backend} decode"] = _per_call_us(lambda: decode(token), iterations)
+
+    verifier = TokenVerifier(TTLCache(maxsize=16, ttl_seconds=300), backend="jose", max_ttl_seconds=300)
+    verifier.verify(token, "access")
+    results["cached verify"] = _per_call_us(lambda: verifier.verify(token, "access"), iterations)
+
+    def reject_malformed():
+        try:
+            verifier.verify("not-a-token", "access")
+        except InvalidToken:
+            pass
+
+    results["malformed rejection"] = _per_call_us(reject_malformed, iterations)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    for name, per_call_us in benchmark(args.iterations).items():
+        logger.info(f"{name:>20}: {per_call_us:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
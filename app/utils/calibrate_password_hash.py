@@ -0,0 +1,86 @@
+"""
+Pick the password hashing cost that fits a latency budget on this machine.
+
+    python -m app.utils.calibrate_password_hash [--target-ms 250] [--scheme bcrypt|scrypt]
+
+Times one hash at increasing costs and prints the settings for the highest cost whose
+median time stays within the budget. Run it on the production hardware: the right cost
+depends on the CPU, and hashes made with an older cost are upgraded at each user's next
+login. Keep the budget well under the login latency target, since
+PASSWORD_HASH_WORKERS hashes run at a time and further logins queue behind them.
+"""
+import argparse
+import logging
+import statistics
+import time
+from typing import Callable, Iterator, List, Tuple
+
+from app.core.config import settings
+from app.utils.password_utils import hash_bcrypt, hash_scrypt
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_PASSWORD = "Calibrate@123"
+
+
+def _median_ms(operation: Callable[[], object], samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(timings)
+
+
+def _bcrypt_candidates() -> Iterator[Tuple[dict, Callable[[], object]]]:
+    for rounds in range(10, 17):
+        yield {"PASSWORD_BCRYPT_ROUNDS": rounds}, lambda rounds=rounds: hash_bcrypt(SAMPLE_PASSWORD, rounds)
+
+
+def _scrypt_candidates() -> Iterator[Tuple[dict, Callable[[], object]]]:
+    r, p = settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+    for log_n in range(14, 21):
+        params = {"PASSWORD_SCRYPT_LOG_N": log_n, "PASSWORD_SCRYPT_R": r, "PASSWORD_SCRYPT_P": p}
+        yield params, lambda log_n=log_n: hash_scrypt(SAMPLE_PASSWORD, log_n, r, p)
+
+
+def calibrate(scheme: str, target_ms: float, samples: int = 3) -> List[Tuple[dict, float]]:
+    """
+    Return the (settings, median ms) of each cost tried, cheapest first. Stops at the
+    first cost over the budget, since each step doubles the work.
+    """
+    candidates = _scrypt_candidates() if scheme == "scrypt" else _bcrypt_candidates()
+    results = []
+    for params, operation in candidates:
+        elapsed_ms = _median_ms(operation, samples)
+        results.append((params, elapsed_ms))
+        if elapsed_ms > target_ms:
+            break
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Time budget for one hash.")
+    parser.add_argument("--scheme", choices=("bcrypt", "scrypt"), default=settings.PASSWORD_HASH_SCHEME)
+    parser.add_argument("--samples", type=int, default=3, help="Hashes timed per cost.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    results = calibrate(args.scheme, args.target_ms, args.samples)
+    for params, elapsed_ms in results:
+        logger.info(f"{params}: {elapsed_ms:.1f} ms")
+
+    within_budget = [params for params, elapsed_ms in results if elapsed_ms <= args.target_ms]
+    if not within_budget:
+        logger.warning(f"Even the lowest {args.scheme} cost takes longer than {args.target_ms:g} ms.")
+        within_budget = [results[0][0]]
+
+    logger.info(f"\nRecommended settings for a {args.target_ms:g} ms budget:")
+    logger.info(f"PASSWORD_HASH_SCHEME={args.scheme}")
+    for name, value in within_budget[-1].items():
+        logger.info(f"{name}={value}")
+
+
+if __name__ == "__main__":
+    main()
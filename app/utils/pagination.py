@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Opaque cursor for the position after a row, from its sort key values.
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("unexpected cursor shape")
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for value, type_ in zip(payload, types)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor.")
+
+
+def keyset_paginate(
+    stmt: Select,
+    sort_column: ColumnElement,
+    id_column: ColumnElement,
+    after: Optional[Tuple[Any, Any]],
+    limit: int,
+) -> Select:
+    """
+    Order `stmt` newest first by (sort_column, id_column) and return the page after the
+    `after` key. One extra row is fetched, so `page_from_rows` can tell whether a next
+    page exists. Unlike OFFSET, the database seeks straight to the position through an
+    index on the two columns, so every page costs the same however deep it is.
+    """
+    if after is not None:
+        # Row comparison, which Postgres turns into a single index range condition
+        stmt = stmt.where(tuple_(sort_column, id_column) < tuple_(*after))
+    return stmt.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1)
+
+
+def page_from_rows(rows: Sequence[Any], limit: int, key) -> Tuple[List[Any], Optional[str]]:
+    """
+    Split the rows fetched by `keyset_paginate` into the page and the cursor of the next
+    page (None on the last page). `key(row)` returns the row's (sort value, id).
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+    return items, next_cursor
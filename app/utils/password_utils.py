@@ -1,6 +1,14 @@
+import base64
+import hashlib
+import hmac
+import os
+from typing import Dict, Tuple
+
 from fastapi import HTTPException, status
 import bcrypt
 
+from app.core.config import settings
+
 # Validation function for password security requirements
 def validate_password(password: str):
     if len(password) < 8:
@@ -30,18 +38,91 @@ def validate_password(password: str):
         )
 
 
-# Hash a password
+# Stored hashes are either bcrypt ("$2b$12$...") or, when PASSWORD_HASH_SCHEME is
+# "scrypt", "$scrypt$ln=15,r=8,p=1$<salt>$<key>". Both verify whatever the setting, so
+# switching schemes only changes new hashes; older ones are upgraded at login.
+SCRYPT_PREFIX = "$scrypt$"
+SCRYPT_KEY_LENGTH = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(
+        password.encode("utf-8"),
+        salt=salt,
+        n=2 ** log_n,
+        r=r,
+        p=p,
+        maxmem=2 ** log_n * r * 256,
+        dklen=SCRYPT_KEY_LENGTH,
+    )
+
+
+def hash_bcrypt(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def hash_scrypt(password: str, log_n: int, r: int, p: int) -> str:
+    salt = os.urandom(16)
+    key = _scrypt(password, salt, log_n, r, p)
+    return f"{SCRYPT_PREFIX}ln={log_n},r={r},p={p}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def _scrypt_params(hashed_password: str) -> Tuple[Dict[str, int], str, str]:
+    params, salt, key = hashed_password[len(SCRYPT_PREFIX):].split("$")
+    return {name: int(value) for name, value in (item.split("=") for item in params.split(","))}, salt, key
+
+
+# Hash a password with the configured scheme and cost. Blocks for the whole round;
+# async code goes through app.core.password_hasher, which runs these on its worker pool.
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
-    return hashed_password.decode("utf-8")
+    if settings.PASSWORD_HASH_SCHEME == "scrypt":
+        return hash_scrypt(
+            password, settings.PASSWORD_SCRYPT_LOG_N, settings.PASSWORD_SCRYPT_R, settings.PASSWORD_SCRYPT_P
+        )
+    return hash_bcrypt(password, settings.PASSWORD_BCRYPT_ROUNDS)
 
 
-# Verify a password against its hashed value
+# Verify a password against its hashed value, whichever scheme produced it
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+    if hashed_password.startswith(SCRYPT_PREFIX):
+        params, salt, key = _scrypt_params(hashed_password)
+        candidate = _scrypt(plain_password, _b64decode(salt), params["ln"], params["r"], params["p"])
+        return hmac.compare_digest(candidate, _b64decode(key))
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
 
+# Whether a stored hash was made with another scheme or cost than the configured one
+def needs_rehash(hashed_password: str) -> bool:
+    if settings.PASSWORD_HASH_SCHEME == "scrypt":
+        if not hashed_password.startswith(SCRYPT_PREFIX):
+            return True
+        try:
+            params, _, _ = _scrypt_params(hashed_password)
+        except ValueError:
+            return True
+        return params != {
+            "ln": settings.PASSWORD_SCRYPT_LOG_N,
+            "r": settings.PASSWORD_SCRYPT_R,
+            "p": settings.PASSWORD_SCRYPT_P,
+        }
+    if hashed_password.startswith(SCRYPT_PREFIX):
+        return True
+    # bcrypt hashes look like "$2b$12$<salt and digest>"
+    try:
+        return int(hashed_password.split("$")[2]) != settings.PASSWORD_BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        # An unrecognized format that still verified: replace it with a current hash
+        return True
+
+
 # Combined utility for validating, hashing, and returning the hashed password
 def validate_and_hash_password(password: str) -> str:
     validate_password(password)
@@ -0,0 +1,119 @@
+"""
+Check that the hot assessment queries are served by their indexes.
+
+    python -m app.utils.query_plans
+
+Runs EXPLAIN for each query against the configured database and exits non-zero when
+a plan does not use the expected index, e.g. after a model or query change drifted
+away from the predicates of the partial indexes. Sequential scans are disabled for the
+check, so the result does not depend on how much data the database holds. The test
+suite runs the same check when TEST_DATABASE_URL points at a migrated database.
+"""
+import asyncio
+import logging
+import sys
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.future import select
+from sqlalchemy.sql import Select
+
+from app.core.database import engine
+from app.models import Career, DimensionCareer, User, UserAssessmentScore, UserResponse, UserTest
+from app.models.personality_trait import PersonalityTrait
+from app.services import reference_data  # noqa: F401  (registers the remaining mapped models)
+from app.services.user import USER_LIST_COLUMNS, _prefix_range
+
+logger = logging.getLogger(__name__)
+
+
+def _checks() -> List[Tuple[str, Select]]:
+    # Mirrors the predicates used in app/services (tests, drafts, recommendations, users)
+    return [
+        (
+            "ix_user_tests_history",
+            select(UserTest)
+            .where(UserTest.user_id == 1, UserTest.is_deleted == False)
+            .order_by(UserTest.created_at.desc(), UserTest.id.desc())
+            .limit(21),
+        ),
+        (
+            "ix_user_responses_draft_by_test",
+            select(UserResponse).where(
+                UserResponse.user_test_id == 1,
+                UserResponse.assessment_type_id == 1,
+                UserResponse.is_draft == True,
+                UserResponse.is_deleted == False,
+            ),
+        ),
+        (
+            "ix_user_responses_submitted_by_test",
+            select(UserResponse).where(
+                UserResponse.user_test_id == 1,
+                UserResponse.assessment_type_id == 1,
+                UserResponse.is_draft == False,
+                UserResponse.is_deleted == False,
+            ),
+        ),
+        ("ix_user_responses_user_id", select(UserResponse).where(UserResponse.user_id == 1)),
+        (
+            "ix_users_listing",
+            select(*USER_LIST_COLUMNS)
+            .where(User.is_deleted == False)
+            .order_by(User.created_at.desc(), User.id.desc())
+            .limit(51),
+        ),
+        ("ix_users_username_prefix", select(User.id).where(_prefix_range(User.username, "adm"))),
+        (
+            "ix_user_assessment_scores_user_test_id",
+            select(UserAssessmentScore).where(UserAssessmentScore.user_test_id == 1),
+        ),
+        ("ix_careers_holland_code_id", select(Career).where(Career.holland_code_id == 1)),
+        ("ix_careers_value_category_id", select(Career).where(Career.value_category_id == 1)),
+        ("ix_dimension_careers_dimension_id", select(DimensionCareer).where(DimensionCareer.dimension_id == 1)),
+        (
+            "ix_personality_traits_personality_type_id",
+            select(PersonalityTrait).where(PersonalityTrait.personality_type_id == 1),
+        ),
+    ]
+
+
+def _index_names(plan: dict) -> Iterator[str]:
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", ()):
+        yield from _index_names(child)
+
+
+async def check_query_plans(db_engine: AsyncEngine = engine) -> List[str]:
+    """
+    Return one message per query whose plan does not use its expected index.
+    """
+    failures = []
+    async with db_engine.connect() as conn:
+        await conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for index_name, stmt in _checks():
+            sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+            result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+            plan = result.scalar()[0]["Plan"]
+            used = list(_index_names(plan))
+            if index_name not in used:
+                failures.append(f"{index_name}: not used (plan uses {used or 'no index'})")
+        await conn.rollback()
+    return failures
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    failures = asyncio.run(check_query_plans())
+    for failure in failures:
+        logger.error(failure)
+    if failures:
+        sys.exit(1)
+    logger.info("All checked queries use their indexes.")
+
+
+if __name__ == "__main__":
+    main()
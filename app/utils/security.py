@@ -1,10 +1,9 @@
-from passlib.context import CryptContext
 import random
+from app.utils.password_utils import hash_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
+# Blocking bcrypt hash; request handlers use `await password_hasher.hash(...)` instead
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return hash_password(password)
 
 def generate_verification_code(length: int = 6) -> str:
     return ''.join(random.choices("0123456789", k=length))
@@ -1,8 +1,16 @@
+import asyncio
 from fastapi import FastAPI
-from app.api.v1.endpoints import auth, user, assessment, ai_recommendation, test, draft, feedback
+from app.api.v1.endpoints import auth, user, assessment, ai_recommendation, test, draft, feedback, system
 from app.api.v1.endpoints.technique_image import learning_style_image_router
 from app.core.database import engine, Base, get_db
+from app.core.inference import inference_executor
+from app.core.password_hasher import password_hasher
+from app.core.config import settings
 from app.core.init import init_roles_and_admin
+from app.core.sql_logging import QueryStatsMiddleware
+from app.services.reference_data import reference_data
+from app.services.refresh_token import run_refresh_token_purge
+from ml_models.registry import model_registry
 from contextlib import asynccontextmanager
 from starlette.middleware.sessions import SessionMiddleware
 import os
@@ -16,13 +24,27 @@ async def lifespan(app: FastAPI):
 
     async for db in get_db():
         await init_roles_and_admin(db)
+        # Warm the reference data cache so the first submissions skip the lookups
+        await reference_data.load(db)
         break
 
+    model_registry.set_active_version(settings.MODEL_VERSION)
+    if settings.MODEL_PRELOAD:
+        await asyncio.to_thread(model_registry.load_all)
+
+    purge_task = asyncio.create_task(run_refresh_token_purge())
+
     yield
 
+    purge_task.cancel()
+    inference_executor.shutdown()
+    password_hasher.shutdown()
+
 
 app = FastAPI(lifespan=lifespan)
 
+app.add_middleware(QueryStatsMiddleware)
+
 
 # Add SessionMiddleware for OAuth
 app.add_middleware(
@@ -40,3 +62,4 @@ app.include_router(ai_recommendation.ai_recommendation_router, prefix="/api/v1/a
 app.include_router(learning_style_image_router, prefix="/api/v1/technique-image", tags=["Learning Style Images"])
 app.include_router(draft.draft_router, prefix="/api/v1/draft", tags=["Draft"])
 app.include_router(feedback.feedback_router, prefix="/api/v1/feedback", tags=["Feedback"])
+app.include_router(system.system_router, prefix="/api/v1/system", tags=["System"])
@@ -0,0 +1,50 @@
+"""Add user_test_counters
+
+Revision ID: 3c9a1f27d4b2
+Revises: fbe24ecca549
+Create Date: 2026-10-17 09:12:44.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1f27d4b2'
+down_revision: Union[str, None] = 'fbe24ecca549'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The table may already exist if the app created it on startup (Base.metadata.create_all).
+    if not sa.inspect(op.get_bind()).has_table('user_test_counters'):
+        op.create_table(
+            'user_test_counters',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('prefix', sa.String(length=100), nullable=False),
+            sa.Column('last_index', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id', 'prefix'),
+        )
+
+    # Continue numbering after the highest existing "<prefix> Test <n>" of every user
+    op.execute(
+        """
+        INSERT INTO user_test_counters (user_id, prefix, last_index)
+        SELECT user_id,
+               substring(name FROM '^(.*) Test [0-9]+$'),
+               max(CAST(substring(name FROM ' Test ([0-9]+)$') AS integer))
+        FROM user_tests
+        WHERE name ~ '^.+ Test [0-9]{1,9}$'
+        GROUP BY 1, 2
+        ON CONFLICT (user_id, prefix)
+        DO UPDATE SET last_index = GREATEST(user_test_counters.last_index, EXCLUDED.last_index)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_test_counters')
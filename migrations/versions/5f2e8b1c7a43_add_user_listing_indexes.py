@@ -0,0 +1,51 @@
+"""Add user listing and prefix search indexes
+
+Revision ID: 5f2e8b1c7a43
+Revises: c5d07a9e3b18
+Create Date: 2026-10-17 12:08:51.472310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2e8b1c7a43'
+down_revision: Union[str, None] = 'c5d07a9e3b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_listing',
+            'users',
+            [sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Prefix search compares lower(...) in the "C" collation as a range
+        op.create_index(
+            'ix_users_username_prefix',
+            'users',
+            [sa.text('lower(username) COLLATE "C"')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'ix_users_email_prefix',
+            'users',
+            [sa.text('lower(email) COLLATE "C"')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in ('ix_users_email_prefix', 'ix_users_username_prefix', 'ix_users_listing'):
+            op.drop_index(name, table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,68 @@
+"""Add foreign-key and filter indexes to the assessment tables
+
+Revision ID: 8e41b6d2c0f7
+Revises: 3c9a1f27d4b2
+Create Date: 2026-10-17 10:03:27.551904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41b6d2c0f7'
+down_revision: Union[str, None] = '3c9a1f27d4b2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (name, table, columns, partial index predicate)
+INDEXES = [
+    ('ix_user_tests_user_id', 'user_tests', ['user_id'], None),
+    ('ix_user_tests_active_by_user', 'user_tests', ['user_id', sa.text('created_at DESC')], 'is_deleted = false'),
+    ('ix_user_responses_user_id', 'user_responses', ['user_id'], None),
+    ('ix_user_responses_user_test_id', 'user_responses', ['user_test_id'], None),
+    (
+        'ix_user_responses_draft_by_test',
+        'user_responses',
+        ['user_test_id', 'assessment_type_id'],
+        'is_deleted = false AND is_draft = true',
+    ),
+    (
+        'ix_user_responses_submitted_by_test',
+        'user_responses',
+        ['user_test_id', 'assessment_type_id'],
+        'is_deleted = false AND is_draft = false',
+    ),
+    ('ix_user_assessment_scores_user_id', 'user_assessment_scores', ['user_id'], None),
+    ('ix_user_assessment_scores_user_test_id', 'user_assessment_scores', ['user_test_id'], None),
+    ('ix_careers_personality_type_id', 'careers', ['personality_type_id'], None),
+    ('ix_careers_holland_code_id', 'careers', ['holland_code_id'], None),
+    ('ix_careers_value_category_id', 'careers', ['value_category_id'], None),
+    ('ix_dimension_careers_dimension_id', 'dimension_careers', ['dimension_id'], None),
+    ('ix_dimension_careers_career_id', 'dimension_careers', ['career_id'], None),
+    ('ix_personality_traits_personality_type_id', 'personality_traits', ['personality_type_id'], None),
+]
+
+
+def upgrade() -> None:
+    # Build the indexes without locking the tables against writes. CONCURRENTLY cannot
+    # run inside a transaction, hence the autocommit block.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
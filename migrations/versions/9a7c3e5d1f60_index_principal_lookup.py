@@ -0,0 +1,33 @@
+"""Index the principal lookup (users.uuid, user_roles.user_id)
+
+Revision ID: 9a7c3e5d1f60
+Revises: 5f2e8b1c7a43
+Create Date: 2026-10-17 12:51:13.086422
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a7c3e5d1f60'
+down_revision: Union[str, None] = '5f2e8b1c7a43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every authenticated request resolves its token's user uuid and that user's roles
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_uuid', 'users', ['uuid'], postgresql_concurrently=True, if_not_exists=True)
+        op.create_index(
+            'ix_user_roles_user_id', 'user_roles', ['user_id'], postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_roles_user_id', table_name='user_roles', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_uuid', table_name='users', postgresql_concurrently=True, if_exists=True)
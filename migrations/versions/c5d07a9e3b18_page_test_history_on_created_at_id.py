@@ -0,0 +1,48 @@
+"""Page the test history on (created_at, id)
+
+Revision ID: c5d07a9e3b18
+Revises: 8e41b6d2c0f7
+Create Date: 2026-10-17 11:26:05.904137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5d07a9e3b18'
+down_revision: Union[str, None] = '8e41b6d2c0f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Replace (user_id, created_at DESC) with an index that also orders by id, so a
+    # keyset page is a single index range scan without a sort.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_tests_history',
+            'user_tests',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_user_tests_active_by_user', table_name='user_tests', postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_user_tests_active_by_user',
+            'user_tests',
+            ['user_id', sa.text('created_at DESC')],
+            postgresql_where=sa.text('is_deleted = false'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index('ix_user_tests_history', table_name='user_tests', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,97 @@
+"""
+Export the tree-ensemble pickles to flat array bundles.
+
+    python -m ml_models.export_forests              # write <model>.flat/ next to each pickle
+    python -m ml_models.export_forests --version v2 # only export one model version
+    python -m ml_models.export_forests --verify     # also check outputs match the pickles exactly
+    python -m ml_models.export_forests --benchmark  # also time both evaluators
+"""
+import argparse
+import logging
+import os
+import time
+
+import joblib
+import numpy as np
+
+from ml_models import features  # noqa: F401  (silences the feature-name warning)
+from ml_models.flat_forest import FlatForest, bundle_path, source_signature
+from ml_models.model_loader import FLAT_FOREST_MODEL_FILES, list_model_versions, model_dir_for_version
+
+logger = logging.getLogger(__name__)
+
+
+def _predict_original(model, X: np.ndarray) -> np.ndarray:
+    if isinstance(model, dict):
+        return np.column_stack([member.predict(X) for member in model.values()])
+    return model.predict(X)
+
+
+def _sample_inputs(forest: FlatForest, n_samples: int, seed: int) -> np.ndarray:
+    # Answers are Likert scores; 0 is what missing answers are filled with.
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 6, size=(n_samples, len(forest.feature_names))).astype(np.float64)
+
+
+def verify(model, forest: FlatForest, n_samples: int = 1000, seed: int = 42) -> None:
+    X = _sample_inputs(forest, n_samples, seed)
+    expected = _predict_original(model, X)
+    actual = forest.predict(X)
+    if expected.shape != actual.shape or not np.array_equal(expected, actual):
+        raise AssertionError(
+            f"Flat forest output differs from the original model "
+            f"(max abs diff {np.max(np.abs(expected - actual)):.3e})."
+        )
+
+
+def benchmark(model, forest: FlatForest, batch_sizes=(1, 32, 256), repeats: int = 20) -> dict:
+    timings = {}
+    for batch_size in batch_sizes:
+        X = _sample_inputs(forest, batch_size, seed=batch_size)
+        started_at = time.perf_counter()
+        for _ in range(repeats):
+            _predict_original(model, X)
+        original_ms = (time.perf_counter() - started_at) / repeats * 1000
+
+        started_at = time.perf_counter()
+        for _ in range(repeats):
+            forest.predict(X)
+        flat_ms = (time.perf_counter() - started_at) / repeats * 1000
+        timings[batch_size] = (original_ms, flat_ms)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export tree ensembles to flat array bundles.")
+    parser.add_argument("--verify", action="store_true", help="check exported outputs match the pickles exactly")
+    parser.add_argument("--benchmark", action="store_true", help="time the original and flat evaluators")
+    parser.add_argument("--version", action="append", help="model version to export (default: all versions)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    model_paths = [
+        os.path.join(model_dir_for_version(version), model_file)
+        for version in (args.version or list_model_versions())
+        for model_file in FLAT_FOREST_MODEL_FILES
+    ]
+    for model_path in model_paths:
+        model = joblib.load(model_path)
+        forest = FlatForest.from_estimator(model)
+        target = bundle_path(model_path)
+        forest.save(target, source=source_signature(model_path))
+        logger.info(f"Exported {forest.n_trees} trees (max depth {forest.max_depth}) to {target}")
+
+        exported = FlatForest.load(target)
+        if args.verify:
+            verify(model, exported)
+            logger.info("  parity: identical to the original model")
+        if args.benchmark:
+            for batch_size, (original_ms, flat_ms) in benchmark(model, exported).items():
+                logger.info(
+                    f"  batch {batch_size:>4}: original {original_ms:8.2f} ms, flat {flat_ms:7.2f} ms "
+                    f"({original_ms / flat_ms:5.1f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
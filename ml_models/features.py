@@ -0,0 +1,87 @@
+from typing import Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureMismatch(ValueError):
+    """
+    The named inputs of a strict build do not match the model's feature columns.
+    """
+
+    def __init__(self, missing: Sequence[str], unexpected: Sequence[str]):
+        self.missing = list(missing)
+        self.unexpected = list(unexpected)
+        problems = []
+        if self.missing:
+            problems.append(f"missing {_preview(self.missing)}")
+        if self.unexpected:
+            problems.append(f"unexpected {_preview(self.unexpected)}")
+        super().__init__(f"Inputs do not match the model features: {'; '.join(problems)}.")
+
+
+def _preview(names: Sequence[str], limit: int = 5) -> str:
+    shown = ", ".join(f"'{name}'" for name in names[:limit])
+    return shown + (f" and {len(names) - limit} more" if len(names) > limit else "")
+
+
+class FeatureVectorBuilder:
+    """
+    Maps named inputs onto a model's feature columns without going through pandas.
+
+    The column-index map is computed once from the model's `feature_names_in_`.
+    By default inputs missing from the mapping are filled with 0 and unknown names are
+    ignored, which matches `DataFrame.reindex(columns=feature_names_in_, fill_value=0)`.
+    With `strict=True` the names must match the columns exactly, as scikit-learn
+    requires of a DataFrame, and FeatureMismatch is raised otherwise.
+    """
+
+    def __init__(self, feature_names: Sequence[str]):
+        self.feature_names = tuple(feature_names)
+        self.index = {name: position for position, name in enumerate(self.feature_names)}
+        self.size = len(self.feature_names)
+
+    @classmethod
+    def for_model(cls, model) -> "FeatureVectorBuilder":
+        feature_names = getattr(model, "feature_names_in_", None)
+        if feature_names is None:
+            raise ValueError(f"{type(model).__name__} was not fitted with feature names.")
+        return cls(list(feature_names))
+
+    @classmethod
+    def for_models(cls, models: Iterable) -> "FeatureVectorBuilder":
+        builders = [cls.for_model(model) for model in models]
+        if not builders:
+            raise ValueError("At least one model is required to build a feature vector.")
+        if any(builder.feature_names != builders[0].feature_names for builder in builders):
+            raise ValueError("Models do not share the same input features.")
+        return builders[0]
+
+    def build(self, values: Mapping[str, float], strict: bool = False) -> np.ndarray:
+        index = self.index
+        if strict and (len(values) != self.size or any(name not in index for name in values)):
+            raise FeatureMismatch(
+                missing=[name for name in self.feature_names if name not in values],
+                unexpected=[name for name in values if name not in index],
+            )
+
+        vector = np.zeros(self.size, dtype=np.float64)
+        for name, value in values.items():
+            position = index.get(name)
+            if position is not None:
+                vector[position] = value
+        return vector
+
+    def stack(self, vectors: Sequence[np.ndarray]) -> np.ndarray:
+        matrix = np.empty((len(vectors), self.size), dtype=np.float64)
+        for row, vector in enumerate(vectors):
+            matrix[row] = vector
+        return matrix
+
+    def frame(self, vectors: Sequence[np.ndarray]) -> pd.DataFrame:
+        """
+        The stacked vectors as a DataFrame with the feature names as columns, for
+        scikit-learn estimators: they check the names against the ones they were fitted
+        with and warn about unnamed input. Wrapping the matrix does not copy it.
+        """
+        return pd.DataFrame(self.stack(vectors), columns=list(self.feature_names), copy=False)
@@ -0,0 +1,219 @@
+import json
+import os
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from sklearn.multioutput import MultiOutputRegressor
+
+META_FILE = "meta.json"
+ARRAY_NAMES = ("feature", "threshold", "left", "right", "value", "roots", "divisor")
+
+
+class FlatForest:
+    """
+    Array-backed evaluator for scikit-learn regression tree ensembles.
+
+    All trees are stored in contiguous node arrays (feature, threshold, children and
+    leaf values). Leaves point to themselves, so `predict` walks every tree for the
+    whole batch at once in `max_depth` vectorized steps. Outputs from several forests
+    (a dict of forests or a MultiOutputRegressor) are merged into one evaluator with
+    one output column per forest.
+
+    The evaluation follows scikit-learn exactly: inputs are compared as float32,
+    leaf values are accumulated tree by tree in the original order and then divided
+    by the number of trees, so predictions are bit-for-bit identical.
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        divisor: np.ndarray,
+        max_depth: int,
+        feature_names: Optional[Sequence[str]] = None,
+        output_names: Optional[Sequence[str]] = None,
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.divisor = divisor
+        self.max_depth = max_depth
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.output_names = list(output_names) if output_names is not None else None
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_outputs(self) -> int:
+        return self.value.shape[1]
+
+    @classmethod
+    def from_estimator(cls, estimator) -> "FlatForest":
+        """
+        Flatten a fitted RandomForestRegressor, DecisionTreeRegressor, MultiOutputRegressor
+        of those, or a dict mapping output names to single-output forests.
+        """
+        if isinstance(estimator, dict):
+            output_names = list(estimator.keys())
+            groups = [_forest_trees(model) for model in estimator.values()]
+            reference = next(iter(estimator.values()))
+            reference_features = list(getattr(reference, "feature_names_in_", []))
+            if any(list(getattr(model, "feature_names_in_", [])) != reference_features for model in estimator.values()):
+                raise ValueError("Models do not share the same input features.")
+        elif isinstance(estimator, MultiOutputRegressor):
+            output_names = None
+            groups = [_forest_trees(model) for model in estimator.estimators_]
+            reference = estimator
+        else:
+            output_names = None
+            groups = [_forest_trees(estimator)]
+            reference = estimator
+
+        feature_names = getattr(reference, "feature_names_in_", None)
+        n_outputs = sum(group[1] for group in groups)
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        divisor = np.zeros(n_outputs, dtype=np.float64)
+        offset = 0
+        column = 0
+        max_depth = 0
+
+        for trees, group_outputs in groups:
+            divisor[column:column + group_outputs] = len(trees)
+            for tree in trees:
+                n_nodes = tree.node_count
+                node_ids = np.arange(n_nodes)
+                is_leaf = tree.children_left == -1
+
+                feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+                left = np.where(is_leaf, node_ids, tree.children_left) + offset
+                right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+                value = np.zeros((n_nodes, n_outputs), dtype=np.float64)
+                value[:, column:column + group_outputs] = tree.value[:, :group_outputs, 0]
+
+                features.append(feature)
+                thresholds.append(tree.threshold.astype(np.float64))
+                lefts.append(left.astype(np.intp))
+                rights.append(right.astype(np.intp))
+                values.append(value)
+                roots.append(offset)
+                max_depth = max(max_depth, tree.max_depth)
+                offset += n_nodes
+            column += group_outputs
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            value=np.concatenate(values),
+            roots=np.asarray(roots, dtype=np.intp),
+            divisor=divisor,
+            max_depth=max_depth,
+            feature_names=list(feature_names) if feature_names is not None else None,
+            output_names=output_names,
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Return the leaf index reached in every tree, shape (n_samples, n_trees).
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+        leaf_values = self.value[leaves]
+        output = np.zeros((leaves.shape[0], self.n_outputs), dtype=np.float64)
+        # Accumulate in tree order, as scikit-learn does, to keep results bit-identical.
+        for tree in range(self.n_trees):
+            output += leaf_values[:, tree]
+        output /= self.divisor
+        return output[:, 0] if self.n_outputs == 1 and self.output_names is None else output
+
+    def save(self, path: str, source: Optional[dict] = None) -> None:
+        """
+        Write the arrays and meta.json to the directory `path`. `source` (from
+        `source_signature`) records which pickle the bundle was exported from; meta.json
+        is written last, so a bundle interrupted mid-export is never taken as current.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in ARRAY_NAMES:
+            np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+        with open(os.path.join(path, META_FILE), "w", encoding="utf-8") as meta_file:
+            json.dump(
+                {
+                    "max_depth": int(self.max_depth),
+                    "feature_names": self.feature_names,
+                    "output_names": self.output_names,
+                    "source": source,
+                },
+                meta_file,
+            )
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> "FlatForest":
+        with open(os.path.join(path, META_FILE), encoding="utf-8") as meta_file:
+            meta = json.load(meta_file)
+        arrays: Dict[str, np.ndarray] = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES
+        }
+        return cls(max_depth=meta["max_depth"], feature_names=meta["feature_names"],
+                   output_names=meta["output_names"], **arrays)
+
+
+def _forest_trees(model) -> tuple:
+    """
+    Return the fitted trees of a forest (or a single tree) and its number of outputs.
+    """
+    if hasattr(model, "tree_"):
+        return [model.tree_], model.tree_.n_outputs
+    trees = [member.tree_ for member in model.estimators_]
+    if not trees:
+        raise ValueError(f"{type(model).__name__} has no fitted trees.")
+    return trees, trees[0].n_outputs
+
+
+def bundle_path(model_path: str) -> str:
+    """
+    Location of the exported bundle for a pickled model, next to the pickle.
+    """
+    return os.path.splitext(model_path)[0] + ".flat"
+
+
+def source_signature(model_path: str) -> dict:
+    """
+    Size and modification time of a pickle, recorded in the bundle exported from it.
+    """
+    stat = os.stat(model_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def bundle_is_current(model_path: str) -> bool:
+    """
+    Whether the pickle has an exported bundle and is unchanged since the export.
+
+    Compares the signature stored in meta.json rather than the bundle directory's mtime,
+    which does not change when an export overwrites the files of an existing bundle.
+    """
+    try:
+        with open(os.path.join(bundle_path(model_path), META_FILE), encoding="utf-8") as meta_file:
+            source = json.load(meta_file).get("source")
+    except (OSError, ValueError):
+        return False
+    return source == source_signature(model_path)
@@ -2,17 +2,54 @@ import os
 import joblib
 import logging
 
+from ml_models.flat_forest import FlatForest, bundle_is_current, bundle_path
+
 logger = logging.getLogger(__name__)
 
 MODEL_DIR = os.path.join(os.getcwd(), "ml_models")
-FEATURE_SCORE_MODEL_PATH = os.path.join(MODEL_DIR, "value_assessment_model", "all_models.pkl")
-TARGET_VALUE_MODEL_PATH = os.path.join(MODEL_DIR, "value_assessment_model", "multi_label_model_rf.pkl")
+MODEL_MMAP_MODE = "r"
+
+# The models shipped in MODEL_DIR are the "default" version; other versions live in
+# MODEL_DIR/versions/<version>/ with the same sub-directory layout.
+DEFAULT_MODEL_VERSION = "default"
+MODEL_VERSIONS_DIR = os.path.join(MODEL_DIR, "versions")
+
+FEATURE_SCORE_MODEL_FILE = os.path.join("value_assessment_model", "all_models.pkl")
+TARGET_VALUE_MODEL_FILE = os.path.join("value_assessment_model", "multi_label_model_rf.pkl")
+DIMENSION_MODELS_FILE = os.path.join("personality_assessment_model", "all_trained_models.pkl")
+INTEREST_PROB_MODEL_FILE = os.path.join("interest_assessment_model", "interest_model.pkl")
+VARK_MODEL_FILE = os.path.join("learning_style_assessment_model", "vark_model_random_forest.pkl")
+
+# Tree ensembles that are served through the flat array evaluator.
+FLAT_FOREST_MODEL_FILES = [
+    DIMENSION_MODELS_FILE,
+    INTEREST_PROB_MODEL_FILE,
+    VARK_MODEL_FILE,
+    FEATURE_SCORE_MODEL_FILE,
+]
+
+
+def model_dir_for_version(version):
+    if version == DEFAULT_MODEL_VERSION:
+        return MODEL_DIR
+    if not version or os.path.basename(version) != version or version.startswith("."):
+        raise ValueError(f"Invalid model version '{version}'.")
+    return os.path.join(MODEL_VERSIONS_DIR, version)
+
 
+def list_model_versions():
+    versions = [DEFAULT_MODEL_VERSION]
+    if os.path.isdir(MODEL_VERSIONS_DIR):
+        versions += sorted(
+            entry for entry in os.listdir(MODEL_VERSIONS_DIR) if os.path.isdir(os.path.join(MODEL_VERSIONS_DIR, entry))
+        )
+    return versions
 
-def load_feature_score_models():
+
+def load_feature_score_models(model_dir=MODEL_DIR):
 
     try:
-        feature_score_models = joblib.load(FEATURE_SCORE_MODEL_PATH)
+        feature_score_models = load_flat_forest(os.path.join(model_dir, FEATURE_SCORE_MODEL_FILE))
         logger.info("Successfully loaded feature score models.")
         return feature_score_models
     except Exception as e:
@@ -20,10 +57,10 @@ def load_feature_score_models():
         raise RuntimeError(f"Failed to load feature score models: {e}")
 
 
-def load_target_value_model():
+def load_target_value_model(model_dir=MODEL_DIR):
 
     try:
-        target_value_model = joblib.load(TARGET_VALUE_MODEL_PATH)
+        target_value_model = joblib.load(os.path.join(model_dir, TARGET_VALUE_MODEL_FILE))
         logger.info("Successfully loaded target value model.")
         return target_value_model
     except Exception as e:
@@ -31,17 +68,16 @@ def load_target_value_model():
         raise RuntimeError(f"Failed to load target value model: {e}")
 
 
-def load_personality_models():
+def load_personality_models(model_dir=MODEL_DIR):
 
-    dimension_models_path = os.path.join(MODEL_DIR, "personality_assessment_model", "all_trained_models.pkl")
-    personality_model_path = os.path.join(MODEL_DIR, "personality_assessment_model", "trained_personality_predictor_model.pkl")
-    label_encoder_path = os.path.join(MODEL_DIR, "personality_assessment_model", "trained_label_encoder.pkl")
+    dimension_models_path = os.path.join(model_dir, DIMENSION_MODELS_FILE)
+    personality_model_path = os.path.join(model_dir, "personality_assessment_model", "trained_personality_predictor_model.pkl")
+    label_encoder_path = os.path.join(model_dir, "personality_assessment_model", "trained_label_encoder.pkl")
 
     try:
         # Load the dimension models
         logger.info("Loading dimension models from all_trained_models.pkl.")
-        with open(dimension_models_path, "rb") as models_file:
-            dimension_models = joblib.load(models_file)
+        dimension_models = load_flat_forest(dimension_models_path)
 
         # Load the personality predictor
         logger.info("Loading personality predictor model.")
@@ -61,25 +97,25 @@ def load_personality_models():
         raise RuntimeError(f"Failed to load personality model or its dependencies: {e}")
 
 
-def load_interest_models():
+def load_interest_models(model_dir=MODEL_DIR):
 
-    class_model_path = os.path.join(MODEL_DIR, "interest_assessment_model", "interest_Type_model.pkl")
-    prob_model_path = os.path.join(MODEL_DIR, "interest_assessment_model", "interest_model.pkl")
-    encoder_path = os.path.join(MODEL_DIR, "interest_assessment_model", "label_encoder.pkl")
+    class_model_path = os.path.join(model_dir, "interest_assessment_model", "interest_Type_model.pkl")
+    prob_model_path = os.path.join(model_dir, INTEREST_PROB_MODEL_FILE)
+    encoder_path = os.path.join(model_dir, "interest_assessment_model", "label_encoder.pkl")
 
     try:
         class_model = joblib.load(class_model_path)
-        prob_model = joblib.load(prob_model_path)
+        prob_model = load_flat_forest(prob_model_path)
         label_encoder = joblib.load(encoder_path)
         return class_model, prob_model, label_encoder
     except Exception as e:
         raise RuntimeError(f"Failed to load interest models or encoders: {e}")
 
 
-def load_skill_model():
+def load_skill_model(model_dir=MODEL_DIR):
 
-    model_path = os.path.join(MODEL_DIR, "skill_assessment_model", "skill_evaluate_model.pkl")
-    encoder_path = os.path.join(MODEL_DIR, "skill_assessment_model", "label_encoders.pkl")
+    model_path = os.path.join(model_dir, "skill_assessment_model", "skill_evaluate_model.pkl")
+    encoder_path = os.path.join(model_dir, "skill_assessment_model", "label_encoders.pkl")
 
     try:
         model = joblib.load(model_path)
@@ -89,11 +125,30 @@ def load_skill_model():
         raise RuntimeError(f"Failed to load skill model or encoders: {e}")
 
 
-def load_vark_model():
+def load_vark_model(model_dir=MODEL_DIR):
 
-    model_path = os.path.join(MODEL_DIR, "learning_style_assessment_model", "vark_model_random_forest.pkl")
+    model_path = os.path.join(model_dir, VARK_MODEL_FILE)
     try:
-        model = joblib.load(model_path)
+        model = load_flat_forest(model_path)
         return model
     except Exception as e:
         raise RuntimeError(f"Failed to load VARK model from {model_path}: {e}")
+
+
+def load_flat_forest(model_path):
+    """
+    Return the flat array evaluator for a tree-ensemble pickle.
+
+    Uses the bundle written by `python -m ml_models.export_forests` when it was exported
+    from the pickle as it is now (same size and modification time). Its arrays are memory-mapped read-only, so every worker process
+    shares the same pages through the OS page cache and the pickle is never unpickled.
+    Otherwise the pickle is loaded and flattened in memory.
+    """
+    flat_path = bundle_path(model_path)
+    if bundle_is_current(model_path):
+        forest = FlatForest.load(flat_path, mmap_mode=MODEL_MMAP_MODE)
+        logger.info(f"Memory-mapped flat forest bundle {flat_path}.")
+        return forest
+
+    logger.info(f"No current flat forest bundle for {model_path}, flattening the pickle in memory.")
+    return FlatForest.from_estimator(joblib.load(model_path))
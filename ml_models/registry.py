@@ -0,0 +1,169 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ml_models.model_loader import DEFAULT_MODEL_VERSION, list_model_versions, model_dir_for_version
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of the assessment models, per model version.
+
+    Each model set is registered with a loader that takes the model directory of a
+    version. Sets are loaded the first time they are requested (or all at once via
+    `load_all`, e.g. at startup) and kept until their version is retired. Loading is
+    guarded by a lock, so concurrent inference threads never deserialize the same
+    files twice.
+
+    `activate` loads every set of a new version before switching `active_version` to it,
+    so no request pays the cold start. Requests pin the version they started with
+    (`pinned`) and keep using it after a swap; the previous version stays loaded for a
+    rollback until the next swap retires it, and a retired version stays loaded until
+    the last request pinned to it is done. Hooks warm up and release copies of the
+    models held elsewhere, e.g. in inference worker processes, at the same points.
+    """
+
+    def __init__(self, active_version: str = DEFAULT_MODEL_VERSION, retained_versions: int = 2):
+        self.active_version = active_version
+        self.retained_versions = max(1, retained_versions)
+        self._loaders: Dict[str, Callable[[str], Any]] = {}
+        self._models: Dict[Tuple[str, str], Any] = {}
+        self._load_times: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._swap_lock = asyncio.Lock()
+        self._history: List[str] = [active_version]
+        self._pins: Counter = Counter()
+        self._warm_up_hooks: List[Callable[[str], Awaitable[None]]] = []
+        self._retire_hooks: List[Callable[[str], None]] = []
+        self.warming_version: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    def register(self, name: str, loader: Callable[[str], Any]) -> None:
+        self._loaders[name] = loader
+
+    def add_warm_up_hook(self, hook: Callable[[str], Awaitable[None]]) -> None:
+        """
+        Await `hook(version)` during `activate`, after the models of `version` are loaded
+        here and before it becomes active. A hook that raises aborts the swap.
+        """
+        self._warm_up_hooks.append(hook)
+
+    def add_retire_hook(self, hook: Callable[[str], None]) -> None:
+        """
+        Call `hook(version)` once `version` is retired.
+        """
+        self._retire_hooks.append(hook)
+
+    def get(self, name: str, version: Optional[str] = None) -> Any:
+        key = (name, version or self.active_version)
+        models = self._models.get(key)
+        if models is not None:
+            return models
+
+        if name not in self._loaders:
+            raise KeyError(f"No models registered under '{name}'.")
+
+        with self._lock:
+            # Another thread may have loaded the set while we were waiting.
+            if key not in self._models:
+                started_at = time.monotonic()
+                self._models[key] = self._loaders[name](model_dir_for_version(key[1]))
+                self._load_times[key] = time.monotonic() - started_at
+                logger.info(f"Loaded '{name}' models ({key[1]}) in {self._load_times[key] * 1000:.1f} ms.")
+            return self._models[key]
+
+    async def get_async(self, name: str, version: Optional[str] = None) -> Any:
+        """
+        Like `get`, but a first-time load runs in a worker thread instead of blocking the event loop.
+        """
+        models = self._models.get((name, version or self.active_version))
+        if models is not None:
+            return models
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, name, version)
+
+    def load_all(self, version: Optional[str] = None) -> List[str]:
+        for name in self._loaders:
+            self.get(name, version)
+        return list(self._loaders)
+
+    @contextmanager
+    def pinned(self) -> Iterator[str]:
+        """
+        Pin the active version for the block and yield it. Use it around every model
+        lookup and prediction of a request, so a swap cannot retire the version while
+        its predictors still need it. Called from the event loop only.
+        """
+        version = self.active_version
+        self._pins[version] += 1
+        try:
+            yield version
+        finally:
+            self._pins[version] -= 1
+            if not self._pins[version]:
+                del self._pins[version]
+                if version not in self._history:
+                    self._retire([version])
+
+    def set_active_version(self, version: str) -> None:
+        if not os.path.isdir(model_dir_for_version(version)):
+            raise ValueError(f"Model version '{version}' does not exist.")
+        self.active_version = version
+        self._history = [version]
+
+    async def activate(self, version: str) -> None:
+        """
+        Warm up every model set of `version` off the event loop, then make it the active version.
+        """
+        async with self._swap_lock:
+            self.warming_version = version
+            self.last_error = None
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.load_all, version)
+                for warm_up in self._warm_up_hooks:
+                    await warm_up(version)
+            except Exception as e:
+                logger.exception(f"Warm-up of model version '{version}' failed; keeping '{self.active_version}'.")
+                self.last_error = f"{version}: {e}"
+                return
+            finally:
+                self.warming_version = None
+
+            previous_version, self.active_version = self.active_version, version
+            self._history = [v for v in self._history if v != version] + [version]
+            # Pinned versions are retired when their last request unpins them
+            self._retire([v for v in self._history[:-self.retained_versions] if not self._pins[v]])
+            self._history = self._history[-self.retained_versions:]
+            logger.info(f"Switched active model version from '{previous_version}' to '{version}'.")
+
+    def _retire(self, versions: List[str]) -> None:
+        with self._lock:
+            for key in [key for key in self._models if key[1] in versions]:
+                del self._models[key]
+                del self._load_times[key]
+        for version in versions:
+            for retire in self._retire_hooks:
+                retire(version)
+
+    def stats(self) -> dict:
+        return {
+            "active_version": self.active_version,
+            "warming_version": self.warming_version,
+            "last_error": self.last_error,
+            "available_versions": list_model_versions(),
+            "registered": sorted(self._loaders),
+            "pinned": dict(self._pins),
+            "loaded": {
+                f"{name}@{version}": round(load_time * 1000, 3)
+                for (name, version), load_time in sorted(self._load_times.items())
+            },
+        }
+
+
+model_registry = ModelRegistry()
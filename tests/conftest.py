@@ -0,0 +1,4 @@
+import os
+
+# Endpoints that run more statements than their query_budget answer with a 500 under test
+os.environ.setdefault("SQL_ENFORCE_QUERY_BUDGETS", "true")
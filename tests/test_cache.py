@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core import cache
+from app.core.cache import TTLCache, prediction_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_entries_expire_after_ttl(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    clock.now += 59.9
+    assert ttl_cache.get("a") == 1
+
+    clock.now += 0.1
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.stats()["size"] == 0
+    assert (ttl_cache.hits, ttl_cache.misses) == (1, 1)
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl_seconds=60)
+    ttl_cache.set("short", 1, ttl_seconds=5)
+    ttl_cache.set("long", 2)
+    clock.now += 10
+    assert ttl_cache.get("short") is None
+    assert ttl_cache.get("long") == 2
+
+
+def test_zero_ttl_never_expires(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl_seconds=0)
+    ttl_cache.set("a", 1)
+    clock.now += 10**9
+    assert ttl_cache.get("a") == 1
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    assert ttl_cache.get("a") == 1
+
+    ttl_cache.set("c", 3)
+    assert ttl_cache.get("b") is None
+    assert ttl_cache.get("a") == 1
+    assert ttl_cache.get("c") == 3
+    assert ttl_cache.evictions == 1
+
+
+def test_overwriting_an_entry_does_not_evict(clock):
+    ttl_cache = TTLCache(maxsize=2, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.set("a", 3)
+    assert ttl_cache.get("a") == 3
+    assert ttl_cache.get("b") == 2
+    assert ttl_cache.evictions == 0
+
+
+def test_zero_maxsize_disables_caching(clock):
+    ttl_cache = TTLCache(maxsize=0, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    assert ttl_cache.get("a") is None
+    assert ttl_cache.stats()["size"] == 0
+
+
+def test_delete_and_clear(clock):
+    ttl_cache = TTLCache(maxsize=10, ttl_seconds=60)
+    ttl_cache.set("a", 1)
+    ttl_cache.set("b", 2)
+    ttl_cache.delete("a")
+    ttl_cache.delete("missing")
+    assert ttl_cache.get("a") is None
+    ttl_cache.clear()
+    assert ttl_cache.get("b") is None
+
+
+def test_prediction_key_depends_on_model_version_and_inputs():
+    vector = np.array([1.0, 2.0, 3.0])
+    key = prediction_key("skills", "v1", vector)
+    assert key == prediction_key("skills", "v1", vector.astype(np.float32))
+    assert key != prediction_key("skills", "v2", vector)
+    assert key != prediction_key("skills", "v1", np.array([1.0, 2.0, 3.5]))
+    assert prediction_key("skills", "v1", vector, vector) != prediction_key("skills", "v1", np.tile(vector, 2))
@@ -0,0 +1,51 @@
+import sqlite3
+import time
+
+from app.core.database import InstrumentedPool, PoolMetrics
+
+
+def _connect():
+    return sqlite3.connect(":memory:")
+
+
+def _slow_connect():
+    time.sleep(0.05)
+    return _connect()
+
+
+def _pool(creator, pool_class=InstrumentedPool):
+    pool = pool_class(creator, pool_size=2, max_overflow=0)
+    pool.metrics = PoolMetrics(slow_checkout_seconds=1.0)
+    return pool
+
+
+class RetryingPool(InstrumentedPool):
+    """Declines the first overflow slot, so QueuePool._do_get retries by calling itself."""
+
+    declined = False
+
+    def _inc_overflow(self) -> bool:
+        if not self.declined:
+            self.declined = True
+            return False
+        return super()._inc_overflow()
+
+
+def test_retried_checkout_is_counted_once():
+    pool = _pool(_connect, RetryingPool)
+    connection = pool.connect()
+    assert pool.declined
+    assert pool.metrics.stats()["checkouts"] == 1
+    connection.close()
+    pool.dispose()
+
+
+def test_connect_time_is_not_counted_as_waiting():
+    pool = _pool(_slow_connect)
+    connections = [pool.connect() for _ in range(2)]
+    stats = pool.metrics.stats()
+    assert stats["checkouts"] == 2
+    assert stats["max_wait_ms"] < 25
+    for connection in connections:
+        connection.close()
+    pool.dispose()
@@ -0,0 +1,51 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.tree import DecisionTreeClassifier
+
+from ml_models.features import FeatureMismatch, FeatureVectorBuilder
+
+FEATURES = ["q1", "q2", "q3"]
+
+
+@pytest.fixture(scope="module")
+def model():
+    X = pd.DataFrame([[1, 2, 3], [3, 2, 1], [2, 2, 2], [1, 1, 1]], columns=FEATURES)
+    return DecisionTreeClassifier(random_state=0).fit(X, [0, 1, 1, 0])
+
+
+def test_build_orders_inputs_by_model_columns(model):
+    builder = FeatureVectorBuilder.for_model(model)
+    assert builder.build({"q3": 3, "q1": 1, "q2": 2}, strict=True).tolist() == [1.0, 2.0, 3.0]
+
+
+def test_lenient_build_fills_missing_and_ignores_unknown_inputs():
+    builder = FeatureVectorBuilder(FEATURES)
+    assert builder.build({"q2": 5, "other": 9}).tolist() == [0.0, 5.0, 0.0]
+
+
+@pytest.mark.parametrize(
+    "values, missing, unexpected",
+    [
+        ({"q1": 1, "q2": 2}, ["q3"], []),
+        ({"q1": 1, "q2": 2, "q3": 3, "q4": 4}, [], ["q4"]),
+        ({"q1": 1, "q2": 2, "Q3": 3}, ["q3"], ["Q3"]),
+        ({}, FEATURES, []),
+    ],
+)
+def test_strict_build_rejects_mismatched_inputs(values, missing, unexpected):
+    with pytest.raises(FeatureMismatch) as error:
+        FeatureVectorBuilder(FEATURES).build(values, strict=True)
+    assert (error.value.missing, error.value.unexpected) == (missing, unexpected)
+
+
+def test_frame_predicts_like_a_dataframe_without_warnings(model):
+    builder = FeatureVectorBuilder.for_model(model)
+    rows = [builder.build({"q1": 3, "q2": 2, "q3": 1}), builder.build({"q1": 1, "q2": 1, "q3": 1})]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        predictions = model.predict(builder.frame(rows))
+    expected = model.predict(pd.DataFrame([[3, 2, 1], [1, 1, 1]], columns=FEATURES))
+    assert np.array_equal(predictions, expected)
@@ -0,0 +1,63 @@
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+
+from ml_models.flat_forest import FlatForest, bundle_is_current, bundle_path, source_signature
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 6, size=(200, 6)).astype(np.float64)
+    y = X[:, 0] * 0.7 - X[:, 3] + rng.normal(size=200)
+    return X, y
+
+
+def test_forest_matches_sklearn(data):
+    X, y = data
+    model = RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0).fit(X, y)
+    assert np.array_equal(FlatForest.from_estimator(model).predict(X), model.predict(X))
+
+
+def test_multi_output_and_dict_of_forests_match_sklearn(data):
+    X, y = data
+    Y = np.column_stack([y, -y])
+    multi = MultiOutputRegressor(RandomForestRegressor(n_estimators=4, random_state=0)).fit(X, Y)
+    assert np.array_equal(FlatForest.from_estimator(multi).predict(X), multi.predict(X))
+
+    forests = {name: RandomForestRegressor(n_estimators=4, random_state=0).fit(X, column) for name, column in
+               zip(("a", "b"), Y.T)}
+    expected = np.column_stack([forest.predict(X) for forest in forests.values()])
+    assert np.array_equal(FlatForest.from_estimator(forests).predict(X), expected)
+
+
+def test_saved_bundle_predicts_the_same(data, tmp_path):
+    X, y = data
+    model = RandomForestRegressor(n_estimators=4, random_state=0).fit(X, y)
+    FlatForest.from_estimator(model).save(str(tmp_path / "model.flat"))
+    loaded = FlatForest.load(str(tmp_path / "model.flat"), mmap_mode="r")
+    assert np.array_equal(loaded.predict(X), model.predict(X))
+
+
+def test_bundle_is_stale_once_the_pickle_changes(data, tmp_path):
+    X, y = data
+    model = RandomForestRegressor(n_estimators=2, random_state=0).fit(X, y)
+    model_path = str(tmp_path / "model.pkl")
+    joblib.dump(model, model_path)
+    assert not bundle_is_current(model_path)
+
+    FlatForest.from_estimator(model).save(bundle_path(model_path), source=source_signature(model_path))
+    assert bundle_is_current(model_path)
+
+    # Re-exporting overwrites files inside the existing bundle directory; only the
+    # recorded signature tells whether the bundle matches the pickle.
+    stat = os.stat(model_path)
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not bundle_is_current(model_path)
+
+    FlatForest.from_estimator(model).save(bundle_path(model_path), source=source_signature(model_path))
+    assert bundle_is_current(model_path)
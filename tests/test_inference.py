@@ -0,0 +1,56 @@
+import asyncio
+
+from app.core.inference import BatchInferenceEngine, InferenceExecutor
+
+
+class BrokenPool(BaseException):
+    pass
+
+
+def double(rows, version):
+    return [row * 2 for row in rows]
+
+
+def drop_last(rows, version):
+    return [row * 2 for row in rows[:-1]]
+
+
+def broken(rows, version):
+    raise BrokenPool()
+
+
+def fail_on_negative(rows, version):
+    if any(row < 0 for row in rows):
+        raise ValueError("negative input")
+    return [row * 2 for row in rows]
+
+
+async def _predict_all(predictor, rows):
+    engine = BatchInferenceEngine(InferenceExecutor("thread", 2), max_batch_size=len(rows), batch_window_ms=50)
+    engine.register("model", predictor)
+    try:
+        return await asyncio.wait_for(
+            asyncio.gather(*(engine.predict("model", row) for row in rows), return_exceptions=True), timeout=5
+        )
+    finally:
+        engine.executor.shutdown()
+
+
+def test_rows_are_batched_and_resolved_in_order():
+    assert asyncio.run(_predict_all(double, [1, 2, 3])) == [2, 4, 6]
+
+
+def test_bad_row_only_fails_its_own_request():
+    results = asyncio.run(_predict_all(fail_on_negative, [1, -1, 3]))
+    assert results[0] == 2 and results[2] == 6
+    assert isinstance(results[1], ValueError)
+
+
+def test_missing_outputs_fail_instead_of_hanging():
+    results = asyncio.run(_predict_all(drop_last, [1, 2, 3]))
+    assert all(isinstance(result, Exception) for result in results)
+
+
+def test_base_exception_from_the_batch_fails_every_request():
+    results = asyncio.run(_predict_all(broken, [1, 2]))
+    assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, select
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_paginate, page_from_rows
+
+KEY_TYPES = (datetime, int)
+
+items = Table("items", MetaData(), Column("id", Integer, primary_key=True), Column("created_at", DateTime))
+
+
+def _cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, KEY_TYPES) == (created_at, 42)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor!",
+        "%%%%",
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+        _cursor({"created_at": "2024-05-01T00:00:00", "id": 1}),
+        _cursor(["2024-05-01T00:00:00"]),
+        _cursor(["2024-05-01T00:00:00", 1, 2]),
+        _cursor(["yesterday", 1]),
+        _cursor(["2024-05-01T00:00:00", "one"]),
+        _cursor(["2024-05-01T00:00:00", None]),
+        _cursor([20240501, 1]),
+    ],
+)
+def test_decode_cursor_rejects_bad_cursors(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, KEY_TYPES)
+    assert error.value.status_code == 400
+
+
+def test_keyset_paginate_seeks_past_the_cursor():
+    stmt = keyset_paginate(select(items), items.c.created_at, items.c.id, (datetime(2024, 5, 1), 42), limit=20)
+    sql = " ".join(str(stmt).split())
+    assert "WHERE (items.created_at, items.id) < (:param_1, :param_2)" in sql
+    assert "ORDER BY items.created_at DESC, items.id DESC" in sql
+    assert stmt._limit == 21
+
+
+def test_page_from_rows_returns_next_cursor_only_when_more_rows_exist():
+    rows = [(datetime(2024, 5, day), day) for day in (5, 4, 3)]
+
+    page, next_cursor = page_from_rows(rows, limit=2, key=lambda row: row)
+    assert page == rows[:2]
+    assert decode_cursor(next_cursor, KEY_TYPES) == rows[1]
+
+    page, next_cursor = page_from_rows(rows, limit=3, key=lambda row: row)
+    assert page == rows
+    assert next_cursor is None
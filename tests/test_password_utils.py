@@ -0,0 +1,39 @@
+import pytest
+
+from app.core.config import settings
+from app.utils.password_utils import hash_password, needs_rehash, verify_password
+
+PASSWORD = "Secret@123"
+
+
+@pytest.fixture
+def fast_hashing(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(settings, "PASSWORD_SCRYPT_LOG_N", 10)
+
+
+@pytest.mark.parametrize("scheme", ["bcrypt", "scrypt"])
+def test_hash_verifies_and_is_current(fast_hashing, monkeypatch, scheme):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", scheme)
+    hashed = hash_password(PASSWORD)
+    assert verify_password(PASSWORD, hashed)
+    assert not verify_password("Wrong@123", hashed)
+    assert not needs_rehash(hashed)
+
+
+def test_changed_cost_or_scheme_needs_rehash(fast_hashing, monkeypatch):
+    hashed = hash_password(PASSWORD)
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 5)
+    assert needs_rehash(hashed)
+
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", "scrypt")
+    assert needs_rehash(hashed)
+    # Hashes of the previous scheme keep verifying
+    assert verify_password(PASSWORD, hashed)
+
+
+@pytest.mark.parametrize("scheme", ["bcrypt", "scrypt"])
+@pytest.mark.parametrize("hashed", ["", "$2b$", "$2b$xx$abc", "legacy-md5-digest", "$scrypt$ln=x$a$b"])
+def test_malformed_hash_needs_rehash_instead_of_failing(monkeypatch, scheme, hashed):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_SCHEME", scheme)
+    assert needs_rehash(hashed)
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import re
+from pathlib import Path
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models import User
+from app.utils.query_plans import _checks, check_query_plans
+
+MIGRATIONS = "\n".join(path.read_text() for path in Path("migrations/versions").glob("*.py"))
+INDEXES = {index.name: index for table in User.metadata.tables.values() for index in table.indexes}
+CHECKS = _checks()
+
+
+def _compiled(stmt) -> str:
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return " ".join(str(sql).split())
+
+
+def _compiled_expression(expression) -> str:
+    if isinstance(expression, str):
+        return expression
+    return " ".join(str(expression.compile(dialect=postgresql.dialect())).split())
+
+
+@pytest.mark.parametrize("index_name, stmt", CHECKS, ids=[name for name, _ in CHECKS])
+def test_checked_index_is_declared_and_migrated(index_name, stmt):
+    assert index_name in INDEXES, f"{index_name} is not declared on a model"
+    assert re.search(rf"\b{index_name}\b", MIGRATIONS), f"{index_name} is not created by a migration"
+
+
+@pytest.mark.parametrize("index_name, stmt", CHECKS, ids=[name for name, _ in CHECKS])
+def test_query_can_use_its_index(index_name, stmt):
+    index = INDEXES[index_name]
+    table = index.table.name
+    sql = _compiled(stmt)
+    assert f"FROM {table}" in sql
+
+    # The leading key must be filtered or sorted on, or the planner cannot use the index
+    leading = re.sub(r"\s+(ASC|DESC)$", "", _compiled_expression(index.expressions[0])).replace(f"{table}.", "")
+    assert leading in sql.replace(f"{table}.", ""), f"{index_name}: query does not use {leading}"
+
+    # A partial index only serves queries that repeat its predicate
+    predicate = index.dialect_options["postgresql"]["where"]
+    if predicate is not None:
+        where = sql.split(" WHERE ", 1)[1]
+        for condition in str(predicate).split(" AND "):
+            assert f"{table}.{condition.strip()}" in where, f"{index_name}: query lacks '{condition}'"
+
+
+# A migrated Postgres database (alembic upgrade head), e.g. the CI service database
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+def test_postgres_uses_the_expected_indexes():
+    async def check():
+        db_engine = create_async_engine(TEST_DATABASE_URL)
+        try:
+            return await check_query_plans(db_engine)
+        finally:
+            await db_engine.dispose()
+
+    assert asyncio.run(check()) == []
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimiter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "_backend", InMemoryRateLimitBackend(max_keys=100, clock=clock))
+    return clock
+
+
+def _request(ip: str = "10.0.0.1") -> Request:
+    return Request({"type": "http", "client": (ip, 1234), "headers": []})
+
+
+def _attempts(limiter: RateLimiter, count: int, email: str = None, ip: str = "10.0.0.1") -> list:
+    async def attempt():
+        try:
+            await limiter.check(_request(ip), email)
+            return 200
+        except HTTPException as e:
+            return e.status_code
+
+    async def attempts():
+        return [await attempt() for _ in range(count)]
+
+    return asyncio.run(attempts())
+
+
+def test_bucket_allows_a_burst_then_refills(clock):
+    limiter = RateLimiter("test", per_ip=3, per_email=0, window_seconds=60)
+    assert _attempts(limiter, 4) == [200, 200, 200, 429]
+
+    clock.now += 20  # one token back
+    assert _attempts(limiter, 2) == [200, 429]
+
+    clock.now += 60  # refilled up to capacity, not beyond
+    assert _attempts(limiter, 4) == [200, 200, 200, 429]
+
+
+def test_email_rejections_do_not_drain_the_ip_bucket(clock):
+    limiter = RateLimiter("test", per_ip=3, per_email=1, window_seconds=60)
+    assert _attempts(limiter, 3, email="a@example.com") == [200, 429, 429]
+    # Only the admitted request took a token from the IP bucket
+    assert _attempts(limiter, 2, email="b@example.com") == [200, 429]
+    assert _attempts(limiter, 1, email="c@example.com") == [200]
+
+
+def test_zero_limit_means_no_limit(clock):
+    limiter = RateLimiter("test", per_ip=0, per_email=0, window_seconds=60)
+    assert _attempts(limiter, 50, email="a@example.com") == [200] * 50
+
+
+def test_invalid_limits_are_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter("test", per_ip=-1, per_email=1, window_seconds=60)
+    with pytest.raises(ValueError):
+        RateLimiter("test", per_ip=1, per_email=1, window_seconds=0)
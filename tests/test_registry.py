@@ -0,0 +1,85 @@
+import asyncio
+
+from ml_models.registry import ModelRegistry
+
+
+def _registry() -> ModelRegistry:
+    registry = ModelRegistry(active_version="default", retained_versions=1)
+    registry.register("model", lambda model_dir: object())
+    return registry
+
+
+def _loaded(registry: ModelRegistry) -> list:
+    return sorted(registry.stats()["loaded"])
+
+
+def test_swap_retires_unpinned_versions():
+    registry = _registry()
+    registry.get("model")
+
+    asyncio.run(registry.activate("v2"))
+
+    assert registry.active_version == "v2"
+    assert _loaded(registry) == ["model@v2"]
+
+
+def test_pinned_version_stays_loaded_until_released():
+    registry = _registry()
+
+    async def request_spanning_a_swap():
+        with registry.pinned() as version:
+            models = registry.get("model", version)
+            await registry.activate("v2")
+            # The predictors of this request still find the same models
+            assert registry.get("model", version) is models
+            assert _loaded(registry) == ["model@default", "model@v2"]
+        assert registry.stats()["pinned"] == {}
+
+    asyncio.run(request_spanning_a_swap())
+    assert _loaded(registry) == ["model@v2"]
+
+
+def test_rollback_keeps_a_released_version_that_is_active_again():
+    registry = _registry()
+
+    async def request_spanning_two_swaps():
+        with registry.pinned():
+            registry.get("model")
+            await registry.activate("v2")
+            await registry.activate("default")
+
+    asyncio.run(request_spanning_two_swaps())
+    assert registry.active_version == "default"
+    assert _loaded(registry) == ["model@default"]
+
+
+def test_warm_up_hooks_run_before_the_swap_and_can_abort_it():
+    registry = _registry()
+    seen = []
+
+    async def warm_up(version):
+        seen.append((version, registry.active_version))
+        if version == "broken":
+            raise RuntimeError("worker failed to start")
+
+    registry.add_warm_up_hook(warm_up)
+    asyncio.run(registry.activate("v2"))
+    asyncio.run(registry.activate("broken"))
+
+    assert seen == [("v2", "default"), ("broken", "v2")]
+    assert registry.active_version == "v2"
+    assert registry.last_error == "broken: worker failed to start"
+
+
+def test_retire_hooks_run_when_the_last_pin_is_released():
+    registry = _registry()
+    retired = []
+    registry.add_retire_hook(retired.append)
+
+    async def request_spanning_a_swap():
+        with registry.pinned():
+            await registry.activate("v2")
+            assert retired == []
+
+    asyncio.run(request_spanning_a_swap())
+    assert retired == ["default"]
@@ -0,0 +1,156 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.core import sql_logging
+from app.core.sql_logging import (
+    QueryBudgetExceeded,
+    QueryStats,
+    QueryStatsMiddleware,
+    exempt_from_budget,
+    instrument_engine,
+    normalize_sql,
+    query_budget,
+    track_queries,
+)
+from main import app
+
+# Statements each endpoint may run; raising one needs a reason in review
+EXPECTED_BUDGETS = {
+    "/api/v1/assessment/process-value-assessment": 2,
+    "/api/v1/assessment/predict-skills": 3,
+    "/api/v1/test/user-tests": 3,
+    "/api/v1/test/get-test-details/{test_uuid}": 2,
+}
+
+
+def test_normalize_sql_replaces_literals_and_params():
+    assert normalize_sql("SELECT * FROM users WHERE id = 42 AND email = 'a@b.c'") == (
+        "SELECT * FROM users WHERE id = ? AND email = ?"
+    )
+    assert normalize_sql("SELECT * FROM t WHERE a = $1 AND b = %(b)s AND c = :c") == (
+        "SELECT * FROM t WHERE a = ? AND b = ? AND c = ?"
+    )
+    assert normalize_sql("SELECT 'it''s'") == "SELECT ?"
+
+
+def test_normalize_sql_collapses_value_lists_and_whitespace():
+    assert normalize_sql("SELECT *\n  FROM t\n WHERE id IN ($1, $2, $3)") == "SELECT * FROM t WHERE id IN (...)"
+    assert normalize_sql("SELECT * FROM t WHERE id IN (1)") == normalize_sql("SELECT * FROM t WHERE id IN (7)")
+
+
+def test_normalize_sql_keeps_casts_and_identifiers():
+    assert normalize_sql("SELECT data::JSONB, col1 FROM t2 WHERE x = 1.5") == (
+        "SELECT data::JSONB, col1 FROM t2 WHERE x = ?"
+    )
+    assert normalize_sql("SELECT " + "x" * 50, max_length=10) == "SELECT xxx"
+
+
+def test_query_stats_counts_statements_and_budget():
+    stats = QueryStats(budget=2)
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.003)
+    assert stats.statements == 2
+    assert stats.db_time == pytest.approx(0.005)
+    assert not stats.over_budget()
+
+    stats.record("SELECT 3", 0.001)
+    assert stats.over_budget()
+    assert "3 queries (budget 2)" in stats.describe()
+
+
+def test_query_stats_without_budget_is_never_over():
+    stats = QueryStats()
+    for i in range(100):
+        stats.record(f"SELECT {i}", 0.0)
+    assert not stats.over_budget()
+
+
+def test_repeated_shapes_detects_n_plus_one():
+    stats = QueryStats()
+    stats.record("SELECT * FROM tests WHERE user_id = $1", 0.0)
+    for test_id in range(5):
+        stats.record(f"SELECT * FROM assessments WHERE test_id = {test_id}", 0.0)
+
+    assert stats.repeated_shapes(3) == [("SELECT * FROM assessments WHERE test_id = ?", 5)]
+    assert stats.repeated_shapes(6) == []
+
+
+def test_exempt_statements_are_timed_but_not_budgeted():
+    with track_queries(budget=1) as stats:
+        stats.record("SELECT * FROM users WHERE id = 1", 0.0)
+        with exempt_from_budget():
+            for i in range(3):
+                stats.record(f"SELECT * FROM skills WHERE id = {i}", 0.0)
+
+    assert stats.statements == 4
+    assert stats.budgeted_statements == 1
+    assert stats.repeated_shapes(2) == []
+
+
+def test_track_queries_raises_when_over_budget():
+    with pytest.raises(QueryBudgetExceeded, match="3x SELECT \\* FROM t WHERE id = \\?"):
+        with track_queries(budget=2) as stats:
+            for i in range(3):
+                stats.record(f"SELECT * FROM t WHERE id = {i}", 0.0)
+
+
+def test_track_queries_counts_statements_of_an_instrumented_engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    with track_queries(budget=2) as stats, engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    assert stats.statements == 2
+    engine.dispose()
+
+
+def _route_budget(route: APIRoute):
+    with track_queries() as stats:
+        for dependency in route.dependant.dependencies:
+            if getattr(dependency.call, "__qualname__", "").startswith("query_budget."):
+                dependency.call()
+    return stats.budget
+
+
+def test_endpoints_declare_their_query_budgets():
+    budgets = {route.path: _route_budget(route) for route in app.routes if isinstance(route, APIRoute)}
+    assert {path: budgets.get(path) for path in EXPECTED_BUDGETS} == EXPECTED_BUDGETS
+
+
+def test_query_budgets_are_enforced_under_test():
+    assert sql_logging.settings.SQL_ENFORCE_QUERY_BUDGETS
+
+
+@pytest.fixture
+def budgeted_client(monkeypatch):
+    monkeypatch.setattr(sql_logging.settings, "SQL_ENFORCE_QUERY_BUDGETS", True)
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    budget_app = FastAPI()
+    budget_app.add_middleware(QueryStatsMiddleware)
+
+    @budget_app.get("/items/{count}", dependencies=[Depends(query_budget(2))])
+    def items(count: int):
+        with engine.connect() as conn:
+            for item_id in range(count):
+                conn.execute(text("SELECT :id"), {"id": item_id})
+        return {"count": count}
+
+    yield TestClient(budget_app)
+    engine.dispose()
+
+
+def test_middleware_reports_queries_within_budget(budgeted_client):
+    response = budgeted_client.get("/items/2")
+    assert response.status_code == 200
+    assert 'desc="2 queries"' in response.headers["Server-Timing"]
+
+
+def test_middleware_fails_requests_over_budget(budgeted_client):
+    response = budgeted_client.get("/items/3")
+    assert response.status_code == 500
+    assert "Query budget exceeded: 3 queries (budget 2)" in response.json()["detail"]
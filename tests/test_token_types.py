@@ -0,0 +1,39 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.token_verifier import InvalidToken, token_verifier
+from app.services.token import create_access_token, create_refresh_token
+from main import app
+
+client = TestClient(app)
+
+
+def _refresh_token() -> str:
+    return create_refresh_token(
+        {"sub": str(uuid.uuid4())}, uuid.uuid4().hex, datetime.utcnow() + timedelta(days=1)
+    )
+
+
+def test_tokens_are_typed():
+    access_token = create_access_token({"sub": str(uuid.uuid4())})
+    assert token_verifier.verify(access_token, "access")["type"] == "access"
+    assert token_verifier.verify(_refresh_token(), "refresh")["type"] == "refresh"
+
+
+def test_refresh_token_is_not_an_access_token():
+    with pytest.raises(InvalidToken):
+        token_verifier.verify(_refresh_token(), "access")
+
+
+def test_access_token_is_not_a_refresh_token():
+    with pytest.raises(InvalidToken):
+        token_verifier.verify(create_access_token({"sub": str(uuid.uuid4())}), "refresh")
+
+
+@pytest.mark.parametrize("path", ["/api/v1/system/db-pool", "/api/v1/auth/me"])
+def test_refresh_token_is_rejected_on_protected_endpoints(path):
+    response = client.get(path, headers={"Authorization": f"Bearer {_refresh_token()}"})
+    assert response.status_code == 401
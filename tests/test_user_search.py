@@ -0,0 +1,30 @@
+import pytest
+
+from app.models import User
+from app.services.user import _prefix_range
+
+
+def _bounds(prefix: str) -> list:
+    clause = _prefix_range(User.username, prefix)
+    comparisons = getattr(clause, "clauses", [clause])
+    return [(comparison.operator.__name__, comparison.right.value) for comparison in comparisons]
+
+
+def test_prefix_range_bounds_the_lowercased_prefix():
+    assert _bounds("Adm") == [("ge", "adm"), ("lt", "adn")]
+
+
+@pytest.mark.parametrize(
+    "prefix, upper",
+    [
+        ("a\ud7ff", "a\ue000"),
+        ("a\uffff", "a\U00010000"),
+    ],
+)
+def test_prefix_range_upper_bound_is_an_encodable_string(prefix, upper):
+    assert _bounds(prefix) == [("ge", prefix), ("lt", upper)]
+    upper.encode("utf-8")
+
+
+def test_prefix_range_after_the_last_code_point_has_no_upper_bound():
+    assert _bounds("a\U0010ffff") == [("ge", "a\U0010ffff")]